@@ -6,10 +6,15 @@ import threading
 import time
 import traceback
 
-from extractors import get_available_extractors
+from extractors import get_available_extractors, describe_fallback
+from utils.agreement import document_agreement
+from utils.matching import MatchingIndex
+from utils.result_store import ResultStore
+from utils.text_index import compact_text_index
 from utils.file_utils import (
     create_output_directories,
     save_extracted_text,
+    save_agreement_report,
     get_file_stats,
     is_valid_file_type,
     get_file_type,
@@ -17,6 +22,171 @@ from utils.file_utils import (
     get_base_filename
 )
 
+# Results table columns: (heading, ExtractionResult attribute, formatter)
+RESULT_COLUMNS = (
+    ("Document", "document", str),
+    ("Library", "library", str),
+    ("Status", "status", str),
+    ("Characters", "char_count", str),
+    ("Words", "word_count", str),
+    ("Lines", "line_count", str),
+    ("Time (s)", "processing_time", lambda value: f"{value:.3f}"),
+    ("Agreement", "agreement", lambda value: f"{value:.3f}"),
+    ("Page Cache", "cache_hit_ratio", lambda value: f"{value:.0%}"),
+    ("Fallback", "fallback", str),
+)
+
+# How often the UI picks up results from the worker thread
+RESULT_POLL_MS = 100
+
+class VirtualResultsView(ttk.Frame):
+    """
+    Sortable, filterable results table that only creates Treeview items
+    for the rows currently on screen, so it stays fast with 100k results.
+    
+    Item IDs are the ResultStore row IDs. on_select, if given, is called
+    with the Tk event whenever the selection changes.
+    """
+    
+    def __init__(self, parent, store, columns, on_select=None):
+        super().__init__(parent)
+        self.store = store
+        self.columns = columns
+        self.on_select = on_select
+        
+        # Display state
+        self.view_ids = []
+        self.offset = 0
+        self.visible_rows = 20
+        self.sort_field = None
+        self.descending = False
+        self.rendered_version = None
+        self.selected_row = None
+        self._filter_job = None
+        
+        # Filter box
+        filter_frame = ttk.Frame(self)
+        filter_frame.pack(fill=tk.X, pady=(0, 5))
+        ttk.Label(filter_frame, text="Filter:").pack(side=tk.LEFT, padx=5)
+        self.filter_var = tk.StringVar()
+        self.filter_var.trace_add("write", self._on_filter_changed)
+        ttk.Entry(filter_frame, textvariable=self.filter_var, width=30).pack(side=tk.LEFT, padx=5)
+        self.count_var = tk.StringVar()
+        ttk.Label(filter_frame, textvariable=self.count_var, foreground="gray").pack(side=tk.RIGHT, padx=5)
+        
+        # Table and scrollbar
+        table_frame = ttk.Frame(self)
+        table_frame.pack(fill=tk.BOTH, expand=True)
+        
+        headings = [heading for heading, _, _ in columns]
+        self.tree = ttk.Treeview(table_frame, columns=headings, show='headings', selectmode='browse')
+        for heading, field, _ in columns:
+            self.tree.heading(heading, text=heading, command=lambda f=field: self.sort_by(f))
+            if heading == "Document" or heading == "Library":
+                self.tree.column(heading, width=120, anchor=tk.W)
+            elif heading == "Status":
+                self.tree.column(heading, width=60, anchor=tk.CENTER)
+            else:
+                self.tree.column(heading, width=80, anchor=tk.CENTER)
+        
+        # Configure tag once rather than per row
+        self.tree.tag_configure('error', background='#ffcccc')
+        
+        self.scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self._on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll_to(self.offset + (-3 if e.delta > 0 else 3)))
+        self.tree.bind("<Button-4>", lambda e: self.scroll_to(self.offset - 3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll_to(self.offset + 3))
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+    
+    def refresh_if_changed(self):
+        if self.rendered_version != self.store.version:
+            self.refresh()
+    
+    def refresh(self):
+        # Re-run filter and sort, then redraw the visible window
+        self.rendered_version = self.store.version
+        if self.selected_row is not None and self.store.get(self.selected_row) is None:
+            self.selected_row = None
+        self.view_ids = self.store.query(self.filter_var.get(), self.sort_field, self.descending)
+        self.count_var.set(f"{len(self.view_ids)} of {len(self.store)} results")
+        self.scroll_to(self.offset)
+    
+    def sort_by(self, field):
+        # Clicking the same heading again flips the direction
+        if self.sort_field == field:
+            self.descending = not self.descending
+        else:
+            self.sort_field = field
+            self.descending = False
+        self.refresh()
+    
+    def scroll_to(self, offset):
+        max_offset = max(0, len(self.view_ids) - self.visible_rows)
+        self.offset = min(max(0, offset), max_offset)
+        self._render()
+    
+    def _render(self):
+        self.tree.delete(*self.tree.get_children())
+        
+        window = self.view_ids[self.offset:self.offset + self.visible_rows]
+        for row_id in window:
+            result = self.store.get(row_id)
+            values = [
+                "N/A" if getattr(result, field) is None else formatter(getattr(result, field))
+                for _, field, formatter in self.columns
+            ]
+            tags = ('error',) if result.status != "Success" else ()
+            self.tree.insert('', 'end', iid=str(row_id), values=values, tags=tags)
+        
+        # Keep the selection when the selected row is still on screen
+        if self.selected_row is not None and self.tree.exists(str(self.selected_row)):
+            self.tree.selection_set(str(self.selected_row))
+            self.tree.focus(str(self.selected_row))
+        
+        total = len(self.view_ids)
+        if total:
+            self.scrollbar.set(self.offset / total, (self.offset + len(window)) / total)
+        else:
+            self.scrollbar.set(0, 1)
+    
+    def _on_scroll(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * len(self.view_ids)))
+        elif unit == "pages":
+            self.scroll_to(self.offset + int(amount) * self.visible_rows)
+        else:
+            self.scroll_to(self.offset + int(amount))
+    
+    def _on_resize(self, event):
+        # Fit as many rows as the widget has room for, minus the heading row
+        row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        visible_rows = max(1, event.height // row_height - 1)
+        if visible_rows != self.visible_rows:
+            self.visible_rows = visible_rows
+            self.scroll_to(self.offset)
+    
+    def _on_select(self, event):
+        selected = self.tree.focus()
+        if selected:
+            self.selected_row = int(selected)
+        if self.on_select is not None:
+            self.on_select(event)
+    
+    def _on_filter_changed(self, *args):
+        # Wait for a pause in typing before filtering large result sets
+        if self._filter_job is not None:
+            self.after_cancel(self._filter_job)
+        self._filter_job = self.after(200, self._apply_filter)
+    
+    def _apply_filter(self):
+        self._filter_job = None
+        self.offset = 0
+        self.refresh()
+
 class DocumentExtractorApp:
     def __init__(self, root):
         self.root = root
@@ -39,8 +209,12 @@ class DocumentExtractorApp:
         self.selected_resume_extractors = {}
         self.selected_jd_extractors = {}
         
-        # Results
-        self.results = []
+        # Results, filled by the worker thread and rendered in batches
+        self.results = ResultStore()
+        self.processing = False
+        
+        # Index of extracted resumes and JDs for matching
+        self.matching_index = MatchingIndex()
         
         # Build UI
         self.build_ui()
@@ -120,26 +294,11 @@ class DocumentExtractorApp:
         self.results_frame = ttk.LabelFrame(self.main_frame, text="Results", padding="10")
         # Don't pack yet - will be shown after processing
         
-        # Create a treeview for results
-        columns = ("Document", "Library", "Status", "Characters", "Words", "Lines", "Time (s)")
-        self.results_tree = ttk.Treeview(self.results_frame, columns=columns, show='headings')
-        
-        # Set column headings
-        for col in columns:
-            self.results_tree.heading(col, text=col)
-            if col == "Document" or col == "Library":
-                self.results_tree.column(col, width=120, anchor=tk.W)
-            elif col == "Status":
-                self.results_tree.column(col, width=60, anchor=tk.CENTER)
-            else:
-                self.results_tree.column(col, width=80, anchor=tk.CENTER)
-                
-        self.results_tree.pack(fill=tk.BOTH, expand=True, pady=5)
-        
-        # Add scrollbars
-        tree_scroll_y = ttk.Scrollbar(self.results_tree, orient="vertical", command=self.results_tree.yview)
-        tree_scroll_y.pack(side=tk.RIGHT, fill=tk.Y)
-        self.results_tree.configure(yscrollcommand=tree_scroll_y.set)
+        # Virtualized table: only the visible rows exist as Treeview items
+        self.results_view = VirtualResultsView(
+            self.results_frame, self.results, RESULT_COLUMNS, on_select=self.show_error_details
+        )
+        self.results_view.pack(fill=tk.BOTH, expand=True, pady=5)
         
         # Buttons
         buttons_frame = ttk.Frame(self.results_frame)
@@ -154,9 +313,6 @@ class DocumentExtractorApp:
         
         self.error_text = tk.Text(self.error_frame, height=5, width=50, wrap=tk.WORD)
         self.error_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        # Bind selection event to show error details
-        self.results_tree.bind("<<TreeviewSelect>>", self.show_error_details)
     
     def browse_resume(self):
         file_path = filedialog.askopenfilename(
@@ -231,8 +387,10 @@ class DocumentExtractorApp:
         if resume_extractors:
             ttk.Label(self.resume_extractors_frame, text=f"Select libraries for {self.resume_type.upper()} processing:").pack(anchor=tk.W, padx=5, pady=5)
             
-            for name in resume_extractors:
-                var = tk.BooleanVar(value=True)  # Default checked
+            for name, spec in resume_extractors.items():
+                # Page-cached variants and the fallback chain repeat other
+                # libraries' output, so they are opt-in
+                var = tk.BooleanVar(value=not spec.derived)
                 self.resume_extractor_vars[name] = var
                 cb = ttk.Checkbutton(self.resume_extractors_frame, text=name, variable=var)
                 cb.pack(anchor=tk.W, padx=20, pady=2)
@@ -245,8 +403,10 @@ class DocumentExtractorApp:
         if jd_extractors:
             ttk.Label(self.jd_extractors_frame, text=f"Select libraries for {self.jd_type.upper()} processing:").pack(anchor=tk.W, padx=5, pady=5)
             
-            for name in jd_extractors:
-                var = tk.BooleanVar(value=True)  # Default checked
+            for name, spec in jd_extractors.items():
+                # Page-cached variants and the fallback chain repeat other
+                # libraries' output, so they are opt-in
+                var = tk.BooleanVar(value=not spec.derived)
                 self.jd_extractor_vars[name] = var
                 cb = ttk.Checkbutton(self.jd_extractors_frame, text=name, variable=var)
                 cb.pack(anchor=tk.W, padx=20, pady=2)
@@ -293,22 +453,24 @@ class DocumentExtractorApp:
         self.results_frame.pack(fill=tk.BOTH, expand=True, pady=10)
         
         # Clear previous results
-        for item in self.results_tree.get_children():
-            self.results_tree.delete(item)
-        
-        self.results = []
+        self.results.clear()
+        self.results_view.refresh()
         
         # Process files in a separate thread
         self.status_var.set("Processing files...")
         self.process_button.config(state=tk.DISABLED)
         self.back_button.config(state=tk.DISABLED)
         
+        self.processing = True
         threading.Thread(target=self._process_files_thread, args=(resume_extractors, jd_extractors)).start()
+        self.poll_results()
     
     def _process_files_thread(self, resume_extractors, jd_extractors):
         try:
             # Process resume
             resume_filename = get_base_filename(self.resume_path)
+            resume_texts = {}
+            resume_results = []
             for name, extractor_func in resume_extractors.items():
                 try:
                     self.root.after(0, lambda: self.status_var.set(f"Processing resume with {name}..."))
@@ -318,45 +480,39 @@ class DocumentExtractorApp:
                     
                     # Save to file
                     output_file = save_extracted_text(text, "resume", name, resume_filename)
+                    # Page-cached and fallback output copies another library's
+                    # text, comparing it would inflate the agreement scores
+                    if stats["success"] and not extractor_func.derived:
+                        resume_texts[name] = text
                     
-                    # Store result
-                    result = {
-                        "document": "Resume",
-                        "library": name,
-                        "status": "Success" if stats["success"] else "Failed",
-                        "char_count": stats["char_count"],
-                        "word_count": stats["word_count"],
-                        "line_count": stats["line_count"],
-                        "time": f"{stats['processing_time']:.3f}",
-                        "error": stats["error"],
-                        "output_file": output_file
-                    }
-                    self.results.append(result)
-                    
-                    # Update UI
-                    self.root.after(0, lambda r=result: self.add_result_to_tree(r))
+                    # Store result (the UI picks it up on its next poll)
+                    result = self.results.add(
+                        "Resume",
+                        name,
+                        "Success" if stats["success"] else "Failed",
+                        char_count=stats["char_count"],
+                        word_count=stats["word_count"],
+                        line_count=stats["line_count"],
+                        processing_time=stats["processing_time"],
+                        error=stats["error"],
+                        output_file=output_file,
+                        cache_hit_ratio=stats.get("cache_hit_ratio"),
+                        fallback=describe_fallback(stats)
+                    )
+                    resume_results.append(result)
                     
                 except Exception as e:
                     # Handle unexpected errors
                     error_msg = f"Error processing resume with {name}: {str(e)}"
-                    result = {
-                        "document": "Resume",
-                        "library": name,
-                        "status": "Error",
-                        "char_count": 0,
-                        "word_count": 0,
-                        "line_count": 0,
-                        "time": "N/A",
-                        "error": error_msg,
-                        "output_file": None
-                    }
-                    self.results.append(result)
-                    
-                    # Update UI
-                    self.root.after(0, lambda r=result: self.add_result_to_tree(r))
+                    self.results.add("Resume", name, "Error", error=error_msg)
+            
+            # Compare the outputs of all successful libraries
+            self._report_agreement(resume_texts, resume_results, resume_filename)
             
             # Process job description
             jd_filename = get_base_filename(self.jd_path)
+            jd_texts = {}
+            jd_results = []
             for name, extractor_func in jd_extractors.items():
                 try:
                     self.root.after(0, lambda: self.status_var.set(f"Processing job description with {name}..."))
@@ -366,103 +522,108 @@ class DocumentExtractorApp:
                     
                     # Save to file
                     output_file = save_extracted_text(text, "jd", name, jd_filename)
+                    # Page-cached and fallback output copies another library's
+                    # text, comparing it would inflate the agreement scores
+                    if stats["success"] and not extractor_func.derived:
+                        jd_texts[name] = text
                     
-                    # Store result
-                    result = {
-                        "document": "Job Description",
-                        "library": name,
-                        "status": "Success" if stats["success"] else "Failed",
-                        "char_count": stats["char_count"],
-                        "word_count": stats["word_count"],
-                        "line_count": stats["line_count"],
-                        "time": f"{stats['processing_time']:.3f}",
-                        "error": stats["error"],
-                        "output_file": output_file
-                    }
-                    self.results.append(result)
-                    
-                    # Update UI
-                    self.root.after(0, lambda r=result: self.add_result_to_tree(r))
+                    # Store result (the UI picks it up on its next poll)
+                    result = self.results.add(
+                        "Job Description",
+                        name,
+                        "Success" if stats["success"] else "Failed",
+                        char_count=stats["char_count"],
+                        word_count=stats["word_count"],
+                        line_count=stats["line_count"],
+                        processing_time=stats["processing_time"],
+                        error=stats["error"],
+                        output_file=output_file,
+                        cache_hit_ratio=stats.get("cache_hit_ratio"),
+                        fallback=describe_fallback(stats)
+                    )
+                    jd_results.append(result)
                     
                 except Exception as e:
                     # Handle unexpected errors
                     error_msg = f"Error processing job description with {name}: {str(e)}"
-                    result = {
-                        "document": "Job Description",
-                        "library": name,
-                        "status": "Error",
-                        "char_count": 0,
-                        "word_count": 0,
-                        "line_count": 0,
-                        "time": "N/A",
-                        "error": error_msg,
-                        "output_file": None
-                    }
-                    self.results.append(result)
-                    
-                    # Update UI
-                    self.root.after(0, lambda r=result: self.add_result_to_tree(r))
+                    self.results.add("Job Description", name, "Error", error=error_msg)
+            
+            # Compare the outputs of all successful libraries
+            self._report_agreement(jd_texts, jd_results, jd_filename)
+            
+            # Merge text index segments now that no saves are running
+            try:
+                compact_text_index()
+            except Exception:
+                traceback.print_exc()
             
             # Processing complete
-            self.root.after(0, lambda: self.status_var.set("Processing complete"))
+            match_score = self._match_score(resume_filename, jd_filename)
+            if match_score is None:
+                status = "Processing complete"
+            else:
+                status = f"Processing complete - resume/JD match score: {match_score:.3f}"
+            self.root.after(0, lambda: self.status_var.set(status))
             
         except Exception as e:
             self.root.after(0, lambda: self.status_var.set(f"Error: {str(e)}"))
             self.root.after(0, lambda: messagebox.showerror("Error", f"An unexpected error occurred: {str(e)}"))
             
         finally:
+            self.processing = False
+            self.root.after(0, self.results_view.refresh_if_changed)
             self.root.after(0, lambda: self.process_button.config(state=tk.NORMAL))
             self.root.after(0, lambda: self.back_button.config(state=tk.NORMAL))
     
-    def add_result_to_tree(self, result):
-        # Add result to the treeview
-        values = (
-            result["document"],
-            result["library"],
-            result["status"],
-            result["char_count"],
-            result["word_count"],
-            result["line_count"],
-            result["time"]
-        )
+    def _report_agreement(self, texts, results, original_filename):
+        # Agreement needs at least two successful outputs to compare
+        if len(texts) < 2:
+            return
         
-        item_id = self.results_tree.insert('', 'end', values=values)
+        report = document_agreement(texts)
+        # Kept with the report so the corpus summary can weigh agreement against speed
+        report["processing_time"] = {
+            result.library: result.processing_time for result in results if result.library in texts
+        }
+        save_agreement_report(report, original_filename)
         
-        # Set tag for error items
-        if result["status"] != "Success":
-            self.results_tree.item(item_id, tags=('error',))
-            
-        # Configure tag
-        self.results_tree.tag_configure('error', background='#ffcccc')
+        for result in results:
+            result.agreement = report["mean_cosine"].get(result.library)
+        self.results.touch()
+    
+    def _match_score(self, resume_filename, jd_filename):
+        # Pick up the new extractions, then score this JD against all resumes
+        self.matching_index.update()
+        matches = self.matching_index.top_matches(k=None, scheme='tfidf', jd_names=[jd_filename])
+        
+        for resume_name, score in matches.get(jd_filename, []):
+            if resume_name == resume_filename:
+                return score
+        return None
+    
+    def poll_results(self):
+        # Render everything added since the last poll in one batch
+        self.results_view.refresh_if_changed()
+        if self.processing:
+            self.root.after(RESULT_POLL_MS, self.poll_results)
     
     def show_error_details(self, event):
         # Get selected item
-        selected = self.results_tree.focus()
+        selected = self.results_view.tree.focus()
         if not selected:
             return
             
-        # Get values
-        values = self.results_tree.item(selected, 'values')
-        if not values:
-            return
-            
-        # Find corresponding result
-        result = None
-        for r in self.results:
-            if (r["document"] == values[0] and 
-                r["library"] == values[1] and 
-                r["status"] == values[2]):
-                result = r
-                break
+        # Row IDs double as Treeview item IDs
+        result = self.results.get(int(selected))
                 
-        if not result or not result["error"]:
+        if not result or not result.error:
             # Hide error frame if no error
             self.error_frame.pack_forget()
             return
             
         # Show error details
         self.error_text.delete(1.0, tk.END)
-        self.error_text.insert(tk.END, result["error"])
+        self.error_text.insert(tk.END, result.error)
         self.error_frame.pack(fill=tk.X, pady=10)
     
     def reset_app(self):
@@ -477,7 +638,8 @@ class DocumentExtractorApp:
         self.jd_type = None
         
         # Clear results
-        self.results = []
+        self.results.clear()
+        self.results_view.refresh()
         
         # Reset UI
         self.results_frame.pack_forget()
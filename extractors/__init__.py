@@ -1,11 +1,20 @@
 # extractors/__init__.py
-from .pdf_extractors import PDF_EXTRACTORS
-from .docx_extractors import DOCX_EXTRACTORS
+from .registry import (
+    ExtractorSpec,
+    get_registry,
+    reload_registry,
+    register_extractor,
+    select_extractors
+)
+from .fallback import extract_with_fallback, check_text_quality, describe_fallback
+from .page_cache import extract_with_page_cache
 
 def get_available_extractors(file_type):
-    """Get dictionary of available extractors for the given file type."""
-    if file_type == 'pdf':
-        return PDF_EXTRACTORS
-    elif file_type == 'docx':
-        return DOCX_EXTRACTORS
-    return {}
\ No newline at end of file
+    """
+    Get dictionary of available extractors for the given file type.
+    
+    Values are ExtractorSpec objects: call them like the extraction
+    function (the backend is imported on first call) and read their
+    capabilities from spec.capabilities.
+    """
+    return dict(get_registry().get(file_type, {}))
\ No newline at end of file
@@ -72,45 +72,3 @@ def extract_with_python_docx(file_path):
             'success': False,
             'error': str(e)
         }
-
-# def extract_with_textract(file_path):
-#     """Extract text from DOCX using textract."""
-#     import textract
-    
-#     start_time = time.time()
-    
-#     try:
-#         text = textract.process(file_path).decode('utf-8')
-                
-#         end_time = time.time()
-        
-#         stats = {
-#             'library': 'textract',
-#             'processing_time': end_time - start_time,
-#             'char_count': len(text),
-#             'word_count': len(text.split()),
-#             'line_count': len(text.splitlines()),
-#             'success': True,
-#             'error': None
-#         }
-        
-#         return text, stats
-    
-    except Exception as e:
-        end_time = time.time()
-        return "", {
-            'library': 'textract',
-            'processing_time': end_time - start_time,
-            'char_count': 0,
-            'word_count': 0,
-            'line_count': 0,
-            'success': False,
-            'error': str(e)
-        }
-
-# Dictionary mapping library names to their extraction functions
-DOCX_EXTRACTORS = {
-    'docx2txt': extract_with_docx2txt,
-    'python_docx': extract_with_python_docx,
-    #'textract': extract_with_textract
-}
\ No newline at end of file
@@ -0,0 +1,222 @@
+# extractors/fallback.py
+import os
+import re
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from .registry import get_registry, select_extractors
+
+# Start the next extractor in parallel if the current one takes longer than this
+HEDGE_AFTER_SECONDS = 2.0
+
+# Extractions that lost a race cannot be cancelled and finish in the
+# background; no new hedge starts while this many are still running
+MAX_ABANDONED = 2
+
+_abandoned = set()
+_abandoned_lock = threading.Lock()
+
+# pdfminer emits "(cid:123)" for glyphs it cannot map to text
+CID_PATTERN = re.compile(r"\(cid:\d+\)")
+
+
+def check_text_quality(text, min_chars=20):
+    """
+    Cheap heuristics for empty or garbled extraction output.
+
+    Returns:
+        Tuple of (acceptable, reason), reason is None when acceptable
+    """
+    stripped = "".join(text.split())
+    if len(stripped) < min_chars:
+        return False, "Too little text extracted"
+
+    if text.count("�") + len(CID_PATTERN.findall(text)) > 0.01 * len(stripped):
+        return False, "Too many unmapped characters"
+
+    printable = sum(1 for c in stripped if c.isprintable())
+    if printable < 0.9 * len(stripped):
+        return False, "Too many non-printable characters"
+
+    words = text.split()
+    if len(stripped) / len(words) > 20:
+        return False, "Words run together (missing spaces)"
+    if sum(1 for word in words if len(word) == 1) > 0.5 * len(words):
+        return False, "Letters split apart (too many single-character words)"
+
+    return True, None
+
+
+def extract_with_fallback(file_path, chain=None, hedge_after=HEDGE_AFTER_SECONDS, quality_check=check_text_quality):
+    """
+    Extract text with the fastest extractor, falling back to slower ones on demand.
+
+    The next extractor in the chain starts when the running ones have all
+    failed or produced text that fails quality_check, or (hedging) when the
+    most recently started one has not finished after hedge_after seconds.
+    The first acceptable result wins.
+
+    Hedging only runs extractors side by side when they are all declared
+    thread_safe; otherwise the next one waits until the running one fails.
+    Extractors still running when a result wins are left to finish in the
+    background, and no new hedge starts while MAX_ABANDONED of them (across
+    all calls) are still running.
+
+    Args:
+        file_path: Path to the PDF or DOCX file
+        chain: Library names to try in order, defaults to every registered
+            extractor for the file type, cheapest first by declared cost
+            (page-cached variants and the chain itself are left out)
+        hedge_after: Seconds before starting the next extractor in parallel
+            (None disables hedging)
+        quality_check: Function taking text, returning (acceptable, reason)
+
+    Returns:
+        Tuple of (text, stats). stats are the winning extractor's stats plus
+        'fallback_stage', 'fallback_trigger', 'quality_ok' and 'fallback_attempts'
+    """
+    file_type = os.path.splitext(file_path)[1].lower().lstrip('.')
+    extractors = get_registry().get(file_type, {})
+    if chain is None:
+        chain = [spec.name for spec in select_extractors(file_type) if not spec.derived]
+    chain = [name for name in chain if name in extractors]
+
+    start_time = time.time()
+    attempts = []
+    pending = {}
+    rejected = []
+    executor = ThreadPoolExecutor(max_workers=max(len(chain), 1))
+    state = {'next_stage': 0, 'last_launch': start_time}
+
+    def can_hedge():
+        if hedge_after is None or state['next_stage'] >= len(chain):
+            return False
+        running = [extractors[chain[stage]] for stage, _ in pending.values()]
+        running.append(extractors[chain[state['next_stage']]])
+        if not all(spec.capabilities['thread_safe'] for spec in running):
+            return False
+        with _abandoned_lock:
+            _abandoned.difference_update([future for future in _abandoned if future.done()])
+            return len(_abandoned) < MAX_ABANDONED
+
+    def launch(trigger):
+        stage = state['next_stage']
+        future = executor.submit(extractors[chain[stage]], file_path)
+        pending[future] = (stage, trigger)
+        state['next_stage'] += 1
+        state['last_launch'] = time.time()
+
+    try:
+        if chain:
+            launch('primary')
+
+        while pending:
+            timeout = None
+            if can_hedge():
+                timeout = max(0.0, state['last_launch'] + hedge_after - time.time())
+
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                launch('hedge')
+                continue
+
+            trigger_for_next = None
+            for future in done:
+                stage, trigger = pending.pop(future)
+                library = chain[stage]
+                try:
+                    text, stats = future.result()
+                except Exception as e:
+                    text, stats = "", {'success': False, 'error': str(e), 'processing_time': 0.0}
+
+                attempt = {
+                    'library': library,
+                    'trigger': trigger,
+                    'processing_time': stats['processing_time'],
+                    'reason': stats['error']
+                }
+                attempts.append(attempt)
+
+                if not stats['success']:
+                    attempt['outcome'] = 'failed'
+                    trigger_for_next = trigger_for_next or 'failure'
+                    continue
+
+                acceptable, reason = quality_check(text)
+                if not acceptable:
+                    attempt['outcome'] = 'rejected'
+                    attempt['reason'] = reason
+                    rejected.append((text, stats, stage, trigger))
+                    trigger_for_next = trigger_for_next or 'quality'
+                    continue
+
+                attempt['outcome'] = 'accepted'
+                return text, _fallback_stats(stats, stage, trigger, True, attempts, pending, chain, start_time)
+
+            # Only escalate when nothing else is still running
+            if not pending and trigger_for_next and state['next_stage'] < len(chain):
+                launch(trigger_for_next)
+
+    finally:
+        # Threads still running (lost hedges) finish in the background
+        with _abandoned_lock:
+            _abandoned.update(pending)
+        executor.shutdown(wait=False)
+
+    # Nothing passed the quality check: return the longest text we got
+    if rejected:
+        text, stats, stage, trigger = max(rejected, key=lambda item: len(item[0]))
+        return text, _fallback_stats(stats, stage, trigger, False, attempts, pending, chain, start_time)
+
+    errors = "; ".join(f"{a['library']}: {a['reason']}" for a in attempts) or "No extractors available"
+    return "", {
+        'library': 'fallback',
+        'processing_time': time.time() - start_time,
+        'char_count': 0,
+        'word_count': 0,
+        'line_count': 0,
+        'success': False,
+        'error': errors,
+        'fallback_stage': None,
+        'fallback_trigger': None,
+        'quality_ok': False,
+        'fallback_attempts': attempts
+    }
+
+
+def _fallback_stats(stats, stage, trigger, quality_ok, attempts, pending, chain, start_time):
+    """Add fallback bookkeeping to the winning extractor's stats."""
+    for abandoned_stage, abandoned_trigger in pending.values():
+        attempts.append({
+            'library': chain[abandoned_stage],
+            'trigger': abandoned_trigger,
+            'processing_time': None,
+            'reason': None,
+            'outcome': 'abandoned'
+        })
+
+    stats = dict(stats)
+    stats['stage_time'] = stats['processing_time']
+    stats['processing_time'] = time.time() - start_time
+    stats['fallback_stage'] = stage
+    stats['fallback_trigger'] = trigger
+    stats['quality_ok'] = quality_ok
+    stats['fallback_attempts'] = attempts
+    return stats
+
+
+def describe_fallback(stats):
+    """
+    Summarize which stage of a fallback run produced the text.
+
+    Returns:
+        e.g. "pdfminer (stage 1, quality)", or None if the stats do not
+        come from a successful fallback run
+    """
+    if stats.get('fallback_stage') is None:
+        return None
+    description = f"{stats['library']} (stage {stats['fallback_stage']}, {stats['fallback_trigger']})"
+    if not stats['quality_ok']:
+        description += " - failed quality check"
+    return description
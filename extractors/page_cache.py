@@ -0,0 +1,211 @@
+# extractors/page_cache.py
+import os
+import time
+import hashlib
+import tempfile
+
+# Cached page text lives under output/ alongside the extracted files
+PAGE_CACHE_DIR = os.path.join("output", ".page_cache")
+
+# Page attributes that change what text a page produces
+PAGE_KEYS = ('/Contents', '/Resources', '/MediaBox', '/CropBox', '/Rotate')
+
+# Links back up the object tree, not part of a page's own content
+SKIPPED_KEYS = {'/Parent', '/P'}
+
+
+def _hash_pdf_object(obj, memo):
+    """
+    Hash a PyPDF2 object by content, following indirect references.
+
+    Shared objects (fonts, images) are hashed once per document via memo,
+    which is keyed on object number and also breaks reference cycles.
+    """
+    from PyPDF2.generic import IndirectObject, DictionaryObject, ArrayObject, StreamObject
+
+    if isinstance(obj, IndirectObject):
+        key = (obj.idnum, obj.generation)
+        if key not in memo:
+            memo[key] = b"cycle"
+            memo[key] = _hash_pdf_object(obj.get_object(), memo)
+        return memo[key]
+
+    digest = hashlib.sha256()
+    if isinstance(obj, DictionaryObject):
+        digest.update(b"stream" if isinstance(obj, StreamObject) else b"dict")
+        for name in sorted(obj):
+            if name in SKIPPED_KEYS:
+                continue
+            digest.update(name.encode('utf-8'))
+            digest.update(_hash_pdf_object(obj.raw_get(name), memo))
+        if isinstance(obj, StreamObject):
+            # Hash the stored (still encoded) bytes, decoding would cost more than the hash
+            data = getattr(obj, '_data', None)
+            digest.update(data if data is not None else obj.get_data())
+    elif isinstance(obj, ArrayObject):
+        digest.update(b"array")
+        for item in obj:
+            digest.update(_hash_pdf_object(item, memo))
+    else:
+        digest.update(type(obj).__name__.encode('utf-8'))
+        digest.update(repr(obj).encode('utf-8'))
+    return digest.digest()
+
+
+def page_fingerprint(page, memo):
+    """Content hash of a page's content streams and resources."""
+    digest = hashlib.sha256()
+    for name in PAGE_KEYS:
+        if name in page:
+            digest.update(name.encode('utf-8'))
+            digest.update(_hash_pdf_object(page.raw_get(name), memo))
+    return digest.hexdigest()
+
+
+def _cache_path(cache_dir, library, fingerprint):
+    return os.path.join(cache_dir, library, fingerprint[:2], f"{fingerprint}.txt")
+
+
+def _read_cached_page(path):
+    # newline='' keeps '\r\n' and '\r' exactly as the backend returned them
+    try:
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            return f.read()
+    except OSError:
+        # Missing or unreadable (e.g. another user's entry): treat as a miss
+        return None
+
+
+def _write_cached_page(path, text):
+    # A unique temp file per writer, so concurrent workers on any host never
+    # publish each other's partial writes
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, temp_file = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with open(fd, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+        # mkstemp creates the file owner-only; other workers sharing the cache must read it
+        os.chmod(temp_file, 0o644)
+        os.replace(temp_file, path)
+    except BaseException:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+        raise
+
+
+def _page_extractor(library, file_path, reader):
+    """
+    Get a function extracting the text of one page (0-based) with a backend.
+
+    Returns:
+        Tuple of (extract_page function, close function)
+    """
+    if library == 'PyPDF2':
+        return (lambda index: reader.pages[index].extract_text() or ""), (lambda: None)
+
+    if library == 'pdfplumber':
+        import pdfplumber
+        pdf = pdfplumber.open(file_path)
+        return (lambda index: pdf.pages[index].extract_text() or ""), pdf.close
+
+    if library == 'pdfminer':
+        from pdfminer.high_level import extract_text as pdfminer_extract
+        return (lambda index: pdfminer_extract(file_path, page_numbers=[index])), (lambda: None)
+
+    raise ValueError(f"Per-page extraction is not supported for {library}")
+
+
+def extract_with_page_cache(file_path, library='PyPDF2', cache_dir=PAGE_CACHE_DIR):
+    """
+    Extract text from PDF, reusing cached text for pages that did not change.
+
+    Each page is keyed on a hash of its content streams and resources, so
+    a revised document only has its changed pages re-extracted by the
+    chosen backend. The output matches the backend's whole-document output.
+
+    Args:
+        file_path: Path to the PDF file
+        library: 'PyPDF2', 'pdfplumber' or 'pdfminer'
+        cache_dir: Directory holding cached page text
+
+    Returns:
+        Tuple of (text, stats); stats add 'pages', 'cache_hits',
+        'cache_misses' and 'cache_hit_ratio' to the usual fields
+    """
+    from PyPDF2 import PdfReader
+
+    start_time = time.time()
+
+    try:
+        with open(file_path, 'rb') as file:
+            reader = PdfReader(file)
+            memo = {}
+            fingerprints = [page_fingerprint(page, memo) for page in reader.pages]
+
+            page_texts = []
+            misses = []
+            for index, fingerprint in enumerate(fingerprints):
+                cached = _read_cached_page(_cache_path(cache_dir, library, fingerprint))
+                page_texts.append(cached)
+                if cached is None:
+                    misses.append(index)
+
+            if misses:
+                extract_page, close = _page_extractor(library, file_path, reader)
+                try:
+                    for index in misses:
+                        page_texts[index] = extract_page(index)
+                        _write_cached_page(_cache_path(cache_dir, library, fingerprints[index]), page_texts[index])
+                finally:
+                    close()
+
+        text = "".join(page_texts)
+        hits = len(fingerprints) - len(misses)
+
+        end_time = time.time()
+
+        stats = {
+            'library': library,
+            'processing_time': end_time - start_time,
+            'char_count': len(text),
+            'word_count': len(text.split()),
+            'line_count': len(text.splitlines()),
+            'success': True,
+            'error': None,
+            'pages': len(fingerprints),
+            'cache_hits': hits,
+            'cache_misses': len(misses),
+            'cache_hit_ratio': hits / len(fingerprints) if fingerprints else 0.0
+        }
+
+        return text, stats
+
+    except Exception as e:
+        end_time = time.time()
+        return "", {
+            'library': library,
+            'processing_time': end_time - start_time,
+            'char_count': 0,
+            'word_count': 0,
+            'line_count': 0,
+            'success': False,
+            'error': str(e),
+            'pages': 0,
+            'cache_hits': 0,
+            'cache_misses': 0,
+            'cache_hit_ratio': 0.0
+        }
+
+
+# Registry targets: the per-page cache in front of each backend that can
+# extract a single page
+def extract_with_pypdf2_cached(file_path):
+    return extract_with_page_cache(file_path, library='PyPDF2')
+
+
+def extract_with_pdfplumber_cached(file_path):
+    return extract_with_page_cache(file_path, library='pdfplumber')
+
+
+def extract_with_pdfminer_cached(file_path):
+    return extract_with_page_cache(file_path, library='pdfminer')
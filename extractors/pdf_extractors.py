@@ -113,46 +113,3 @@ def extract_with_pdfminer(file_path):
             'success': False,
             'error': str(e)
         }
-
-# def extract_with_textract(file_path):
-#     """Extract text from PDF using textract."""
-#     import textract
-    
-#     start_time = time.time()
-    
-#     try:
-#         text = textract.process(file_path, method='pdfminer').decode('utf-8')
-                
-#         end_time = time.time()
-        
-#         stats = {
-#             'library': 'textract',
-#             'processing_time': end_time - start_time,
-#             'char_count': len(text),
-#             'word_count': len(text.split()),
-#             'line_count': len(text.splitlines()),
-#             'success': True,
-#             'error': None
-#         }
-        
-#         return text, stats
-    
-#     except Exception as e:
-#         end_time = time.time()
-#         return "", {
-#             'library': 'textract',
-#             'processing_time': end_time - start_time,
-#             'char_count': 0,
-#             'word_count': 0,
-#             'line_count': 0,
-#             'success': False,
-#             'error': str(e)
-#         }
-
-# Dictionary mapping library names to their extraction functions
-PDF_EXTRACTORS = {
-    'PyPDF2': extract_with_pypdf2,
-    'pdfplumber': extract_with_pdfplumber,
-    'pdfminer': extract_with_pdfminer,
-    #'textract': extract_with_textract
-}
\ No newline at end of file
@@ -0,0 +1,331 @@
+# extractors/registry.py
+import os
+import json
+import logging
+import importlib
+import importlib.util
+
+logger = logging.getLogger(__name__)
+
+# Packages can register extractors under this entry point group, e.g.
+#   [project.entry-points."doc_text_extractors.pdf"]
+#   mylib = "mypackage.extract:extract_pdf"
+ENTRY_POINT_GROUP = "doc_text_extractors"
+
+# Optional JSON file adding extractors or overriding capabilities
+CONFIG_FILE = "extractors.json"
+CONFIG_ENV_VAR = "DOC_EXTRACTORS_CONFIG"
+
+FILE_TYPES = ('pdf', 'docx')
+
+# What the registry assumes about an extractor that does not say otherwise.
+# Capabilities describe the extraction function's call contract, not what
+# the underlying library could do: only declare one the function implements.
+# cost is relative to the cheapest built-in extractor (1.0).
+DEFAULT_CAPABILITIES = {
+    'streaming': False,      # yields text page by page instead of returning it whole
+    'page_ranges': False,    # accepts a pages= argument to extract a subset
+    'buffer_input': False,   # accepts a file object as well as a path
+    'thread_safe': True,     # safe to run concurrently in one process
+    'page_cache': False,     # reuses cached text for pages that did not change
+    'composite': False,      # runs other registered extractors (fallback chain)
+    'cost': 1.0,
+}
+
+# Built-in extractors, in the same format as the config file. They all take
+# a file path and return the whole text, so only thread safety, cost, page
+# caching and composition differ from the defaults. Optional backends list their modules under 'requires'
+# and are hidden when missing.
+BUILTIN_EXTRACTORS = [
+    {
+        'name': 'PyPDF2',
+        'file_types': ['pdf'],
+        'target': 'extractors.pdf_extractors:extract_with_pypdf2',
+        'capabilities': {'cost': 1.0},
+    },
+    {
+        'name': 'pdfplumber',
+        'file_types': ['pdf'],
+        'target': 'extractors.pdf_extractors:extract_with_pdfplumber',
+        'capabilities': {'cost': 4.0},
+    },
+    {
+        'name': 'pdfminer',
+        'file_types': ['pdf'],
+        'target': 'extractors.pdf_extractors:extract_with_pdfminer',
+        'capabilities': {'cost': 3.0},
+    },
+    {
+        'name': 'docx2txt',
+        'file_types': ['docx'],
+        'target': 'extractors.docx_extractors:extract_with_docx2txt',
+        'capabilities': {'cost': 1.0},
+    },
+    {
+        'name': 'python_docx',
+        'file_types': ['docx'],
+        'target': 'extractors.docx_extractors:extract_with_python_docx',
+        'capabilities': {'cost': 2.0},
+    },
+    {
+        'name': 'textract',
+        'file_types': ['pdf', 'docx'],
+        'target': 'extractors.textract_extractors:extract_with_textract',
+        'requires': ['textract'],
+        'capabilities': {'thread_safe': False, 'cost': 5.0},
+    },
+    # The same PDF backends behind the per-page cache (extractors/page_cache.py)
+    {
+        'name': 'PyPDF2_cached',
+        'file_types': ['pdf'],
+        'target': 'extractors.page_cache:extract_with_pypdf2_cached',
+        'capabilities': {'page_cache': True, 'cost': 1.0},
+    },
+    {
+        'name': 'pdfplumber_cached',
+        'file_types': ['pdf'],
+        'target': 'extractors.page_cache:extract_with_pdfplumber_cached',
+        'capabilities': {'page_cache': True, 'cost': 4.0},
+    },
+    {
+        'name': 'pdfminer_cached',
+        'file_types': ['pdf'],
+        'target': 'extractors.page_cache:extract_with_pdfminer_cached',
+        'capabilities': {'page_cache': True, 'cost': 3.0},
+    },
+    # Cheapest extractor first, slower ones on failure (extractors/fallback.py)
+    {
+        'name': 'fallback',
+        'file_types': ['pdf', 'docx'],
+        'target': 'extractors.fallback:extract_with_fallback',
+        'capabilities': {'composite': True, 'cost': 1.0},
+    },
+]
+
+
+class ExtractorSpec:
+    """
+    A registered extractor: its metadata plus a lazily imported function.
+
+    Calling the spec imports the target module on first use and then
+    behaves exactly like the extraction function it wraps.
+    """
+
+    __slots__ = ('name', 'file_type', 'target', 'capabilities', '_func')
+
+    def __init__(self, name, file_type, target, capabilities=None):
+        self.name = name
+        self.file_type = file_type
+        self.target = target
+        self.capabilities = dict(DEFAULT_CAPABILITIES, **(capabilities or {}))
+        self._func = None
+
+    def __repr__(self):
+        return f"ExtractorSpec({self.name!r}, {self.file_type!r}, {self.target!r})"
+
+    def __call__(self, file_path, **kwargs):
+        # Extra arguments (e.g. pages=) are only valid for extractors that
+        # declare the matching capability
+        return self.load()(file_path, **kwargs)
+
+    @property
+    def derived(self):
+        """Whether the output repeats other registered extractors' output."""
+        return self.capabilities['page_cache'] or self.capabilities['composite']
+
+    @property
+    def loaded(self):
+        return self._func is not None
+
+    def load(self):
+        """Import and return the extraction function."""
+        if self._func is None:
+            if callable(self.target):
+                self._func = self.target
+            else:
+                module_name, _, attribute = self.target.partition(':')
+                func = importlib.import_module(module_name)
+                for part in attribute.split('.'):
+                    func = getattr(func, part)
+                self._func = func
+        return self._func
+
+
+# file_type -> {name: ExtractorSpec}, built on first use
+_registry = None
+
+
+def _is_installed(module_names):
+    """Check that modules can be imported, without importing them."""
+    try:
+        return all(importlib.util.find_spec(name) is not None for name in module_names)
+    except (ImportError, ValueError):
+        return False
+
+
+def _validate_entry(entry, needs_target=True):
+    """
+    Check the shape of an extractor entry.
+
+    Returns:
+        None if the entry is usable, otherwise a description of the problem
+    """
+    if not isinstance(entry, dict):
+        return "entry is not an object"
+    if not isinstance(entry.get('name'), str) or not entry['name']:
+        return "missing 'name'"
+    if needs_target:
+        target = entry.get('target')
+        if not callable(target) and not (isinstance(target, str) and ':' in target):
+            return "'target' must be \"module:function\""
+    file_types = entry.get('file_types', [] if needs_target else list(FILE_TYPES))
+    if not isinstance(file_types, list) or (needs_target and not file_types):
+        return "'file_types' must be a non-empty list"
+    unknown = [file_type for file_type in file_types if file_type not in FILE_TYPES]
+    if unknown:
+        return f"unknown file types {unknown}"
+    if not isinstance(entry.get('requires', []), list):
+        return "'requires' must be a list"
+    capabilities = entry.get('capabilities') or {}
+    if not isinstance(capabilities, dict):
+        return "'capabilities' must be an object"
+    for key, value in capabilities.items():
+        if key == 'cost':
+            # bool is an int subclass, but True is not a cost
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                return "'cost' must be a number"
+        elif not isinstance(value, bool):
+            return f"capability {key!r} must be true or false"
+    return None
+
+
+def _register(registry, entry, source="config"):
+    """Add an entry to the registry, skipping (and logging) invalid ones."""
+    problem = _validate_entry(entry)
+    if problem is not None:
+        logger.warning("Skipping extractor from %s: %s (%r)", source, problem, entry)
+        return
+    if not _is_installed(entry.get('requires', [])):
+        return
+    for file_type in entry['file_types']:
+        registry.setdefault(file_type, {})[entry['name']] = ExtractorSpec(
+            entry['name'], file_type, entry['target'], entry.get('capabilities')
+        )
+
+
+def _load_config(path):
+    """Read extractor entries from the JSON config file, if there is one."""
+    if not os.path.exists(path):
+        return []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except (OSError, ValueError) as e:
+        # A broken config must not take the built-in extractors down with it
+        logger.warning("Ignoring extractor config %s: %s", path, e)
+        return []
+
+    entries = config.get('extractors', []) if isinstance(config, dict) else None
+    if not isinstance(entries, list):
+        logger.warning("Ignoring extractor config %s: 'extractors' must be a list", path)
+        return []
+    return entries
+
+
+def _entry_points(group):
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:
+        # Python 3.7 has no importlib.metadata; entry point plugins are skipped
+        return []
+    eps = entry_points()
+    if hasattr(eps, 'select'):
+        return list(eps.select(group=group))
+    return list(eps.get(group, []))
+
+
+def _build_registry():
+    registry = {file_type: {} for file_type in FILE_TYPES}
+
+    for entry in BUILTIN_EXTRACTORS:
+        _register(registry, entry)
+
+    # Entry points only contribute a name and target; nothing is imported here
+    for file_type in FILE_TYPES:
+        for entry_point in _entry_points(f"{ENTRY_POINT_GROUP}.{file_type}"):
+            _register(registry, {
+                'name': entry_point.name,
+                'file_types': [file_type],
+                'target': entry_point.value,
+            }, source=f"entry point {entry_point.name}")
+
+    # Config entries without a target only override capabilities
+    config_path = os.environ.get(CONFIG_ENV_VAR, CONFIG_FILE)
+    for entry in _load_config(config_path):
+        if isinstance(entry, dict) and 'target' in entry:
+            _register(registry, entry, source=config_path)
+            continue
+        problem = _validate_entry(entry, needs_target=False)
+        if problem is not None:
+            logger.warning("Skipping extractor from %s: %s (%r)", config_path, problem, entry)
+            continue
+        for file_type in entry.get('file_types', FILE_TYPES):
+            spec = registry.get(file_type, {}).get(entry['name'])
+            if spec is not None:
+                spec.capabilities.update(entry.get('capabilities') or {})
+
+    return registry
+
+
+def get_registry():
+    """Get the extractor registry, discovering extractors on first call."""
+    global _registry
+    if _registry is None:
+        _registry = _build_registry()
+    return _registry
+
+
+def reload_registry():
+    """Discard the registry so the next lookup rediscovers extractors."""
+    global _registry
+    _registry = None
+
+
+def register_extractor(name, file_types, target, capabilities=None):
+    """
+    Register an extractor at runtime.
+
+    Args:
+        name: Library name shown to users
+        file_types: List of file types it handles ('pdf', 'docx')
+        target: Extraction function, or "module:function" to import lazily
+        capabilities: Dictionary overriding DEFAULT_CAPABILITIES
+    """
+    entry = {
+        'name': name,
+        'file_types': file_types,
+        'target': target,
+        'capabilities': capabilities,
+    }
+    problem = _validate_entry(entry)
+    if problem is not None:
+        raise ValueError(f"Invalid extractor {name!r}: {problem}")
+    _register(get_registry(), entry, source="register_extractor")
+
+
+def select_extractors(file_type, **requirements):
+    """
+    Get extractors whose capabilities match, cheapest first.
+
+    Args:
+        file_type: 'pdf' or 'docx'
+        **requirements: Capability values to match, e.g. thread_safe=True
+
+    Returns:
+        List of ExtractorSpec
+    """
+    specs = [
+        spec for spec in get_registry().get(file_type, {}).values()
+        if all(spec.capabilities.get(key) == value for key, value in requirements.items())
+    ]
+    return sorted(specs, key=lambda spec: spec.capabilities['cost'])
@@ -0,0 +1,41 @@
+# extractors/textract_extractors.py
+import os
+import time
+
+def extract_with_textract(file_path):
+    """Extract text from PDF or DOCX using textract."""
+    import textract
+    
+    start_time = time.time()
+    
+    try:
+        if os.path.splitext(file_path)[1].lower() == '.pdf':
+            text = textract.process(file_path, method='pdfminer').decode('utf-8')
+        else:
+            text = textract.process(file_path).decode('utf-8')
+                
+        end_time = time.time()
+        
+        stats = {
+            'library': 'textract',
+            'processing_time': end_time - start_time,
+            'char_count': len(text),
+            'word_count': len(text.split()),
+            'line_count': len(text.splitlines()),
+            'success': True,
+            'error': None
+        }
+        
+        return text, stats
+    
+    except Exception as e:
+        end_time = time.time()
+        return "", {
+            'library': 'textract',
+            'processing_time': end_time - start_time,
+            'char_count': 0,
+            'word_count': 0,
+            'line_count': 0,
+            'success': False,
+            'error': str(e)
+        }
\ No newline at end of file
@@ -0,0 +1,191 @@
+# utils/agreement.py
+import re
+import zlib
+from itertools import combinations
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Size of the hashed token space. Collisions only matter when two different
+# tokens land in the same bucket, which is negligible for document-sized texts.
+HASH_BITS = 20
+
+
+def hash_token_vector(text, hash_bits=HASH_BITS):
+    """
+    Turn text into a sparse hashed bag-of-tokens vector.
+
+    Args:
+        text: The extracted text content
+        hash_bits: Number of bits in the hashed feature space
+
+    Returns:
+        Tuple of (indices, counts) as NumPy arrays, indices sorted and unique
+    """
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    if not tokens:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+    # Hash each distinct token once, then fold the counts into buckets
+    unique_tokens, counts = np.unique(np.array(tokens), return_counts=True)
+    mask = (1 << hash_bits) - 1
+    buckets = np.fromiter(
+        (zlib.crc32(token.encode('utf-8')) & mask for token in unique_tokens),
+        dtype=np.int64,
+        count=len(unique_tokens)
+    )
+    indices, inverse = np.unique(buckets, return_inverse=True)
+    folded = np.bincount(inverse, weights=counts, minlength=len(indices))
+    return indices, folded
+
+
+def compare_vectors(vec_a, vec_b):
+    """
+    Compute similarity and diff statistics between two hashed token vectors.
+
+    Returns:
+        Dictionary with cosine and Jaccard similarity plus token diff counts
+    """
+    idx_a, cnt_a = vec_a
+    idx_b, cnt_b = vec_b
+    total_a = float(cnt_a.sum())
+    total_b = float(cnt_b.sum())
+
+    if total_a == 0 and total_b == 0:
+        return {
+            'cosine': 1.0,
+            'jaccard': 1.0,
+            'common_tokens': 0,
+            'only_in_a': 0,
+            'only_in_b': 0,
+            'tokens_a': 0,
+            'tokens_b': 0
+        }
+
+    _, pos_a, pos_b = np.intersect1d(idx_a, idx_b, assume_unique=True, return_indices=True)
+    shared_a = cnt_a[pos_a]
+    shared_b = cnt_b[pos_b]
+
+    dot = float(np.dot(shared_a, shared_b))
+    norm = float(np.sqrt(np.dot(cnt_a, cnt_a) * np.dot(cnt_b, cnt_b)))
+    common = float(np.minimum(shared_a, shared_b).sum())
+    # Multiset Jaccard: sum(min) / sum(max) == common / (a + b - common)
+    union = total_a + total_b - common
+
+    return {
+        'cosine': dot / norm if norm else 0.0,
+        'jaccard': common / union if union else 0.0,
+        'common_tokens': int(common),
+        'only_in_a': int(total_a - common),
+        'only_in_b': int(total_b - common),
+        'tokens_a': int(total_a),
+        'tokens_b': int(total_b)
+    }
+
+
+def document_agreement(texts, hash_bits=HASH_BITS):
+    """
+    Compare every pair of extractor outputs for a single document.
+
+    Args:
+        texts: Dictionary mapping library name to extracted text
+        hash_bits: Number of bits in the hashed feature space
+
+    Returns:
+        Dictionary with a 'pairs' list and a per-library 'mean_cosine' score
+        (average similarity to the other libraries, None if there are none)
+    """
+    vectors = {name: hash_token_vector(text, hash_bits) for name, text in texts.items()}
+
+    pairs = []
+    scores = {name: [] for name in texts}
+    for lib_a, lib_b in combinations(sorted(texts), 2):
+        metrics = compare_vectors(vectors[lib_a], vectors[lib_b])
+        metrics['library_a'] = lib_a
+        metrics['library_b'] = lib_b
+        pairs.append(metrics)
+        scores[lib_a].append(metrics['cosine'])
+        scores[lib_b].append(metrics['cosine'])
+
+    return {
+        'pairs': pairs,
+        'mean_cosine': {
+            name: (float(np.mean(values)) if values else None)
+            for name, values in scores.items()
+        }
+    }
+
+
+def summarize_agreement(reports):
+    """
+    Aggregate per-document agreement reports across a corpus.
+
+    Args:
+        reports: Iterable of dictionaries returned by document_agreement
+
+    Returns:
+        Dictionary keyed by "libA vs libB" with document count and the mean,
+        median and minimum of cosine and Jaccard similarity
+    """
+    grouped = {}
+    for report in reports:
+        for pair in report['pairs']:
+            key = f"{pair['library_a']} vs {pair['library_b']}"
+            grouped.setdefault(key, []).append((pair['cosine'], pair['jaccard']))
+
+    summary = {}
+    for key, values in grouped.items():
+        matrix = np.asarray(values, dtype=np.float64)
+        cosine, jaccard = matrix[:, 0], matrix[:, 1]
+        summary[key] = {
+            'documents': len(values),
+            'mean_cosine': float(cosine.mean()),
+            'median_cosine': float(np.median(cosine)),
+            'min_cosine': float(cosine.min()),
+            'mean_jaccard': float(jaccard.mean()),
+            'min_jaccard': float(jaccard.min())
+        }
+    return summary
+
+
+def cheapest_agreeing_library(summary, reference, mean_times, threshold=0.95):
+    """
+    Pick the fastest library whose output agrees with the reference library.
+
+    Args:
+        summary: Dictionary returned by summarize_agreement
+        reference: Name of the library treated as ground truth
+        mean_times: Dictionary mapping library name to mean processing time
+        threshold: Minimum mean cosine similarity to the reference
+
+    Returns:
+        Name of the chosen library (the reference itself if nothing cheaper agrees)
+    """
+    candidates = [reference]
+    for key, stats in summary.items():
+        lib_a, lib_b = key.split(' vs ')
+        if reference not in (lib_a, lib_b) or stats['mean_cosine'] < threshold:
+            continue
+        candidates.append(lib_b if lib_a == reference else lib_a)
+
+    return min(candidates, key=lambda name: mean_times.get(name, float('inf')))
+
+
+def mean_processing_times(reports):
+    """
+    Average each library's processing time across agreement reports.
+
+    Args:
+        reports: Agreement reports with a 'processing_time' dictionary
+            mapping library name to seconds (reports without one are skipped)
+
+    Returns:
+        Dictionary mapping library name to mean processing time
+    """
+    times = {}
+    for report in reports:
+        for name, seconds in (report.get('processing_time') or {}).items():
+            if seconds is not None:
+                times.setdefault(name, []).append(seconds)
+    return {name: float(np.mean(values)) for name, values in times.items()}
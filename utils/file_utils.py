@@ -1,8 +1,17 @@
 # utils/file_utils.py
 import os
+import json
 import shutil
+import logging
+import tempfile
 from pathlib import Path
 
+
+# Append-only record of every saved extraction, one JSON object per line
+EXTRACTION_LOG = "extractions.jsonl"
+
+logger = logging.getLogger(__name__)
+
 def create_output_directories():
     """Create the base output directory if it doesn't exist."""
     # Just create the base output directory
@@ -29,12 +38,82 @@ def save_extracted_text(text, file_type, library_name, original_filename):
     # Create output path with library name as suffix
     output_file = f"{file_dir}/{original_filename}_{library_name}.txt"
     
-    # Write text to file
+    # Write text to a temporary file and swap it in, so readers (and other
+    # workers saving the same extraction) never see a partial file. mkstemp
+    # gives every writer its own temp file, even across hosts
+    fd, temp_file = tempfile.mkstemp(dir=file_dir, suffix=".tmp")
+    try:
+        with open(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        # mkstemp creates the file owner-only; keep outputs readable like before
+        os.chmod(temp_file, 0o644)
+        os.replace(temp_file, output_file)
+    except BaseException:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+        raise
+    
+    # Record the extraction so indexes can pick it up incrementally
+    entry = {
+        'document': original_filename,
+        'file_type': file_type,
+        'library': library_name,
+        'path': output_file
+    }
+    with open(f"output/{EXTRACTION_LOG}", 'a', encoding='utf-8') as f:
+        f.write(json.dumps(entry) + "\n")
+    
+    # Make the text searchable. The file and log entry are already written,
+    # so an indexing failure must not turn a good extraction into an error;
+    # the next update picks the entry up from the log
+    try:
+        from utils.text_index import update_text_index
+        update_text_index()
+    except Exception:
+        logger.exception("Failed to index %s; it will be indexed by the next update", output_file)
+    
+    return output_file
+
+def save_agreement_report(report, original_filename):
+    """
+    Save the cross-library agreement report next to the extracted text files.
+    
+    Args:
+        report: Dictionary returned by utils.agreement.document_agreement
+        original_filename: Original filename without extension
+        
+    Returns:
+        Path to the saved report
+    """
+    file_dir = f"output/{original_filename}"
+    os.makedirs(file_dir, exist_ok=True)
+    
+    output_file = f"{file_dir}/{original_filename}_agreement.json"
+    
     with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(text)
+        json.dump(report, f, indent=2)
     
     return output_file
 
+def load_agreement_reports(output_dir="output"):
+    """
+    Load every saved agreement report.
+    
+    Args:
+        output_dir: Directory holding one folder per processed file
+        
+    Returns:
+        List of report dictionaries (unreadable reports are skipped)
+    """
+    reports = []
+    for path in sorted(Path(output_dir).glob("*/*_agreement.json")):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                reports.append(json.load(f))
+        except (OSError, ValueError):
+            logger.warning("Skipping unreadable agreement report %s", path)
+    return reports
+
 def get_file_stats(file_path):
     """Get basic file statistics."""
     file_size = os.path.getsize(file_path)
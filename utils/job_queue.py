@@ -0,0 +1,309 @@
+# utils/job_queue.py
+import os
+import time
+import socket
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+QUEUE_FILE = "jobs.sqlite"
+
+# Default lease length; a worker that stops heartbeating loses its job after this
+LEASE_SECONDS = 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id INTEGER PRIMARY KEY,
+    document_path TEXT NOT NULL,
+    file_type TEXT NOT NULL,
+    extractor TEXT NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    result_path TEXT,
+    error TEXT,
+    updated REAL NOT NULL,
+    UNIQUE (document_path, file_type, extractor)
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, lease_expires);
+"""
+
+
+def default_worker_id():
+    """Identify a worker by host and process, unique across a shared filesystem."""
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+class JobQueue:
+    """
+    Durable (document, extractor) job queue stored in a SQLite file.
+
+    Workers claim a job by taking a time-limited lease and keep it alive
+    with heartbeats. A job whose lease expires goes back to other workers
+    until its attempts run out. Completion and failure are only recorded
+    by the current lease holder, so a worker that lost its lease cannot
+    overwrite the outcome of the worker that took over.
+
+    The file uses SQLite's default rollback journal (not WAL), which
+    relies on file locking and therefore also works when the queue sits on
+    a filesystem shared between hosts, provided that filesystem implements
+    locks correctly.
+    """
+
+    def __init__(self, path=os.path.join("output", QUEUE_FILE)):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def enqueue(self, document_path, file_type, extractor, max_attempts=3):
+        """
+        Add a job unless the same (document, type, extractor) is already queued.
+
+        A job that already failed is requeued with its attempts reset.
+
+        Args:
+            document_path: Path to the PDF or DOCX file, as seen by every worker
+            file_type: 'resume' or 'jd'
+            extractor: Library name from get_available_extractors
+            max_attempts: How many times the job may be claimed before it fails
+
+        Returns:
+            True if the job was added or requeued, False if it is already
+            pending, running or done
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO jobs (document_path, file_type, extractor, max_attempts, updated) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (document_path, file_type, extractor, max_attempts, now)
+            )
+            if cursor.rowcount == 1:
+                return True
+
+            cursor = conn.execute(
+                "UPDATE jobs SET state = 'pending', attempts = 0, max_attempts = ?, error = NULL, "
+                "lease_owner = NULL, lease_expires = NULL, updated = ? "
+                "WHERE document_path = ? AND file_type = ? AND extractor = ? AND state = 'failed'",
+                (max_attempts, now, document_path, file_type, extractor)
+            )
+            return cursor.rowcount == 1
+
+    def claim(self, worker_id, lease_seconds=LEASE_SECONDS):
+        """
+        Lease the oldest available job.
+
+        Returns:
+            Job dictionary, or None if nothing is available
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            # Expired leases with no attempts left are failed, not retried
+            conn.execute(
+                "UPDATE jobs SET state = 'failed', lease_owner = NULL, updated = ?, "
+                "error = COALESCE(error, 'Lease expired') "
+                "WHERE state = 'running' AND lease_expires < ? AND attempts >= max_attempts",
+                (now, now)
+            )
+            row = conn.execute(
+                "SELECT job_id, document_path, file_type, extractor, attempts FROM jobs "
+                "WHERE state = 'pending' OR (state = 'running' AND lease_expires < ?) "
+                "ORDER BY job_id LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            job_id, document_path, file_type, extractor, attempts = row
+            conn.execute(
+                "UPDATE jobs SET state = 'running', attempts = attempts + 1, lease_owner = ?, "
+                "lease_expires = ?, updated = ? WHERE job_id = ?",
+                (worker_id, now + lease_seconds, now, job_id)
+            )
+
+        return {
+            'job_id': job_id,
+            'document_path': document_path,
+            'file_type': file_type,
+            'extractor': extractor,
+            'attempt': attempts + 1
+        }
+
+    def heartbeat(self, job_id, worker_id, lease_seconds=LEASE_SECONDS):
+        """Extend a lease. Returns False if the worker no longer holds it."""
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated = ? "
+                "WHERE job_id = ? AND lease_owner = ? AND state = 'running'",
+                (now + lease_seconds, now, job_id, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, job_id, worker_id, result_path):
+        """Mark a job done. Returns False if the worker no longer holds the lease."""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET state = 'done', result_path = ?, error = NULL, lease_owner = NULL, "
+                "updated = ? WHERE job_id = ? AND lease_owner = ? AND state = 'running'",
+                (result_path, time.time(), job_id, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, job_id, worker_id, error):
+        """
+        Record a failed attempt; the job is retried until its attempts run out.
+
+        Returns:
+            False if the worker no longer holds the lease
+        """
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET state = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'pending' END, "
+                "error = ?, lease_owner = NULL, updated = ? "
+                "WHERE job_id = ? AND lease_owner = ? AND state = 'running'",
+                (error, time.time(), job_id, worker_id)
+            )
+            return cursor.rowcount == 1
+
+    def counts(self):
+        """Get the number of jobs in each state."""
+        with self._connect() as conn:
+            return dict(conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state").fetchall())
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        # IMMEDIATE takes the write lock up front so two workers never claim the same job
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+
+def run_job(queue, job, worker_id, lease_seconds=LEASE_SECONDS):
+    """
+    Run one claimed job while heartbeating its lease.
+
+    Returns:
+        The extraction stats if the job completed successfully, otherwise None
+    """
+    # Imported here so the queue itself can be used without the extractors
+    from extractors import get_available_extractors
+    from utils.file_utils import save_extracted_text, get_file_type, get_base_filename
+
+    stop = threading.Event()
+
+    def keep_alive():
+        while not stop.wait(lease_seconds / 3):
+            try:
+                if not queue.heartbeat(job['job_id'], worker_id, lease_seconds):
+                    return
+            except sqlite3.Error:
+                # e.g. a lock timeout on a busy shared filesystem; the lease
+                # has two more ticks left, so try again on the next one
+                logger.warning("Heartbeat for job %s failed, retrying", job['job_id'], exc_info=True)
+
+    heartbeat_thread = threading.Thread(target=keep_alive, daemon=True)
+    heartbeat_thread.start()
+    try:
+        extractors = get_available_extractors(get_file_type(job['document_path']))
+        extractor_func = extractors.get(job['extractor'])
+        if extractor_func is None:
+            queue.fail(job['job_id'], worker_id, f"Unknown extractor: {job['extractor']}")
+            return None
+
+        text, stats = extractor_func(job['document_path'])
+        if not stats['success']:
+            queue.fail(job['job_id'], worker_id, stats['error'])
+            return None
+
+        # The output path depends only on the job, so a rerun after a lost
+        # lease rewrites the same file instead of producing a duplicate
+        output_file = save_extracted_text(
+            text, job['file_type'], job['extractor'], get_base_filename(job['document_path'])
+        )
+        return stats if queue.complete(job['job_id'], worker_id, output_file) else None
+
+    except Exception as e:
+        queue.fail(job['job_id'], worker_id, str(e))
+        return None
+
+    finally:
+        stop.set()
+        heartbeat_thread.join()
+
+
+def run_worker(queue, worker_id=None, lease_seconds=LEASE_SECONDS, poll_interval=1.0, exit_when_idle=True):
+    """
+    Claim and run jobs until the queue is drained.
+
+    Args:
+        queue: JobQueue to pull from
+        worker_id: Unique worker name, defaults to host:pid:thread
+        lease_seconds: Lease length for each claimed job
+        poll_interval: Seconds to wait before polling an empty queue again
+        exit_when_idle: Return once no job is available instead of polling
+
+    Returns:
+        Dictionary with the number of jobs that succeeded and failed, the
+        pages read and served from the page cache by cached extractors, and
+        how often each library won a fallback run
+    """
+    worker_id = worker_id or default_worker_id()
+    # Set when jobs ran since the text index was last compacted
+    needs_compaction = False
+    summary = {'succeeded': 0, 'failed': 0, 'cached_pages': 0, 'cache_hits': 0, 'fallback_winners': {}}
+
+    while True:
+        job = queue.claim(worker_id, lease_seconds)
+        if job is None:
+            if needs_compaction:
+                # Merge index segments while idle, never inside a save
+                _compact_text_index()
+                needs_compaction = False
+            if exit_when_idle:
+                return summary
+            time.sleep(poll_interval)
+            continue
+
+        stats = run_job(queue, job, worker_id, lease_seconds)
+        needs_compaction = True
+        if stats is None:
+            summary['failed'] += 1
+            continue
+
+        summary['succeeded'] += 1
+        if 'cache_hits' in stats:
+            summary['cached_pages'] += stats['pages']
+            summary['cache_hits'] += stats['cache_hits']
+        if stats.get('fallback_stage') is not None:
+            winners = summary['fallback_winners']
+            winners[stats['library']] = winners.get(stats['library'], 0) + 1
+
+
+def _compact_text_index():
+    from utils.text_index import compact_text_index
+
+    try:
+        compact_text_index()
+    except Exception:
+        # Compaction only affects query speed; the next idle period retries
+        logger.exception("Failed to compact the text index")
@@ -0,0 +1,228 @@
+# utils/matching.py
+import os
+import json
+
+import numpy as np
+from scipy import sparse
+
+from utils.agreement import TOKEN_PATTERN
+from utils.file_utils import EXTRACTION_LOG
+
+# BM25 parameters (standard Okapi defaults)
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Number of JDs scored per sparse matrix product, bounds peak memory
+SCORE_BLOCK_SIZE = 256
+
+
+class MatchingIndex:
+    """
+    Sparse term index over extracted resume and job description texts.
+
+    The index follows the extraction log written by save_extracted_text, so
+    calling update() only reads extractions saved since the last call.
+    Each document keeps one text: the one from the most preferred library,
+    or the most recent non-empty extraction if no preference is given.
+    """
+
+    def __init__(self, output_dir="output", preferred_libraries=None):
+        self.log_path = os.path.join(output_dir, EXTRACTION_LOG)
+        self.preferred_libraries = list(preferred_libraries or [])
+        self._log_offset = 0
+
+        # term -> column index, shared by resumes and JDs
+        self.vocabulary = {}
+
+        # file_type -> {document: (library, term indices, term counts)}
+        self._documents = {'resume': {}, 'jd': {}}
+
+        # file_type -> (document names, CSR term-count matrix), rebuilt lazily
+        self._matrices = {}
+
+    def update(self):
+        """
+        Index extractions saved since the last update.
+
+        Returns:
+            Number of documents added or replaced
+        """
+        if not os.path.exists(self.log_path):
+            return 0
+
+        with open(self.log_path, 'rb') as f:
+            f.seek(self._log_offset)
+            lines = f.readlines()
+            # Leave a partially written last line for the next update
+            if lines and not lines[-1].endswith(b'\n'):
+                lines.pop()
+            self._log_offset += sum(len(line) for line in lines)
+
+        changed = 0
+        for line in lines:
+            entry = json.loads(line.decode('utf-8'))
+            if self._should_replace(entry) and self.add_document(
+                    entry['file_type'], entry['document'], entry['library'],
+                    self._read_text(entry['path'])):
+                changed += 1
+        return changed
+
+    def add_document(self, file_type, document, library, text):
+        """
+        Add or replace the text for a document.
+
+        Args:
+            file_type: 'resume' or 'jd'
+            document: Document name (original filename without extension)
+            library: Name of the extraction library that produced the text
+            text: The extracted text content
+
+        Returns:
+            True if the document was indexed, False if the text was empty
+        """
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        if not tokens:
+            return False
+
+        terms, counts = np.unique(np.array(tokens), return_counts=True)
+        indices = np.fromiter(
+            (self.vocabulary.setdefault(term, len(self.vocabulary)) for term in terms),
+            dtype=np.int64,
+            count=len(terms)
+        )
+        order = np.argsort(indices)
+
+        self._documents[file_type][document] = (library, indices[order], counts[order].astype(np.float64))
+        self._matrices.pop(file_type, None)
+        return True
+
+    def top_matches(self, k=10, scheme='bm25', jd_names=None):
+        """
+        Score every indexed resume against every indexed JD.
+
+        Args:
+            k: Number of matches to return per JD (None for all resumes)
+            scheme: 'bm25' or 'tfidf' (cosine similarity of TF-IDF vectors)
+            jd_names: Optional list of JD names to restrict scoring to
+
+        Returns:
+            Dictionary mapping JD name to a list of (resume name, score),
+            best match first
+        """
+        resume_names, resumes = self._matrix('resume')
+        jd_names_all, jds = self._matrix('jd')
+        if not resume_names or not jd_names_all:
+            return {}
+
+        if jd_names is not None:
+            wanted = set(jd_names)
+            rows = [i for i, name in enumerate(jd_names_all) if name in wanted]
+            jd_names_all = [jd_names_all[i] for i in rows]
+            jds = jds[rows]
+
+        if scheme == 'bm25':
+            doc_weights, query_weights = self._bm25_weights(resumes, jds)
+        elif scheme == 'tfidf':
+            doc_weights, query_weights = self._tfidf_weights(resumes, jds)
+        else:
+            raise ValueError(f"Unknown scoring scheme: {scheme}")
+
+        k = len(resume_names) if k is None else min(k, len(resume_names))
+        doc_weights_t = doc_weights.T.tocsc()
+
+        matches = {}
+        for start in range(0, query_weights.shape[0], SCORE_BLOCK_SIZE):
+            block = (query_weights[start:start + SCORE_BLOCK_SIZE] @ doc_weights_t).toarray()
+
+            # Partial sort for the top k, then order just those k
+            top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(block, top, axis=1)
+            order = np.argsort(-top_scores, axis=1)
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+            for row, jd_name in enumerate(jd_names_all[start:start + SCORE_BLOCK_SIZE]):
+                matches[jd_name] = [
+                    (resume_names[col], float(score))
+                    for col, score in zip(top[row], top_scores[row])
+                ]
+        return matches
+
+    def _should_replace(self, entry):
+        """Check whether a log entry should replace the indexed text."""
+        if entry['file_type'] not in self._documents:
+            return False
+        current = self._documents[entry['file_type']].get(entry['document'])
+        if current is None or not self.preferred_libraries:
+            return True
+        return self._preference(entry['library']) <= self._preference(current[0])
+
+    def _preference(self, library):
+        if library in self.preferred_libraries:
+            return self.preferred_libraries.index(library)
+        return len(self.preferred_libraries)
+
+    def _read_text(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return ""
+
+    def _matrix(self, file_type):
+        """Get (document names, CSR term counts) for a file type."""
+        if file_type not in self._matrices:
+            documents = self._documents[file_type]
+            names = list(documents)
+            rows = [documents[name] for name in names]
+
+            lengths = np.array([len(indices) for _, indices, _ in rows], dtype=np.int64)
+            indptr = np.concatenate(([0], np.cumsum(lengths)))
+            if rows:
+                indices = np.concatenate([indices for _, indices, _ in rows])
+                data = np.concatenate([counts for _, _, counts in rows])
+            else:
+                indices = np.empty(0, dtype=np.int64)
+                data = np.empty(0, dtype=np.float64)
+
+            matrix = sparse.csr_matrix((data, indices, indptr), shape=(len(names), len(self.vocabulary)))
+            self._matrices[file_type] = (names, matrix)
+
+        names, matrix = self._matrices[file_type]
+        # The vocabulary may have grown since this matrix was built
+        if matrix.shape[1] != len(self.vocabulary):
+            matrix.resize((matrix.shape[0], len(self.vocabulary)))
+        return names, matrix
+
+    def _bm25_weights(self, resumes, jds):
+        """BM25: weight resume terms, JDs act as binary queries."""
+        n_docs = resumes.shape[0]
+        df = np.bincount(resumes.indices, minlength=resumes.shape[1])
+        idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+
+        doc_lengths = np.asarray(resumes.sum(axis=1)).ravel()
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_lengths / doc_lengths.mean())
+
+        weights = resumes.copy()
+        tf = weights.data
+        row_norm = np.repeat(norm, np.diff(weights.indptr))
+        weights.data = idf[weights.indices] * tf * (BM25_K1 + 1) / (tf + row_norm)
+
+        queries = jds.copy()
+        queries.data = np.ones_like(queries.data)
+        return weights, queries
+
+    def _tfidf_weights(self, resumes, jds):
+        """Sublinear TF-IDF with smoothed IDF, both sides L2 normalised."""
+        n_docs = resumes.shape[0]
+        df = np.bincount(resumes.indices, minlength=resumes.shape[1])
+        idf = np.log((1 + n_docs) / (1 + df)) + 1
+
+        weighted = []
+        for matrix in (resumes, jds):
+            matrix = matrix.copy()
+            matrix.data = (1 + np.log(matrix.data)) * idf[matrix.indices]
+            row_norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+            row_norms[row_norms == 0] = 1
+            weighted.append(sparse.diags(1 / row_norms) @ matrix)
+        return weighted[0].tocsr(), weighted[1].tocsr()
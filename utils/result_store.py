@@ -0,0 +1,114 @@
+# utils/result_store.py
+import threading
+
+
+class ExtractionResult:
+    """One extraction result row. Row IDs are positions in the ResultStore."""
+
+    __slots__ = (
+        'row_id', 'document', 'library', 'status', 'char_count', 'word_count',
+        'line_count', 'processing_time', 'error', 'output_file', 'agreement',
+        'cache_hit_ratio', 'fallback'
+    )
+
+    def __init__(self, row_id, document, library, status, char_count=0, word_count=0,
+                 line_count=0, processing_time=None, error=None, output_file=None, agreement=None,
+                 cache_hit_ratio=None, fallback=None):
+        self.row_id = row_id
+        self.document = document
+        self.library = library
+        self.status = status
+        self.char_count = char_count
+        self.word_count = word_count
+        self.line_count = line_count
+        self.processing_time = processing_time
+        self.error = error
+        self.output_file = output_file
+        self.agreement = agreement
+        self.cache_hit_ratio = cache_hit_ratio
+        self.fallback = fallback
+
+
+class ResultStore:
+    """
+    Append-only, thread-safe collection of extraction results.
+
+    Worker threads add and update rows; the UI thread polls `version` to
+    see whether anything changed since it last rendered, and looks rows up
+    by ID in constant time.
+    """
+
+    # Fields matched by the text filter
+    FILTER_FIELDS = ('document', 'library', 'status')
+
+    def __init__(self):
+        self._rows = []
+        self._lock = threading.Lock()
+        self.version = 0
+
+    def __len__(self):
+        return len(self._rows)
+
+    def add(self, document, library, status, **fields):
+        """
+        Add a result row.
+
+        Returns:
+            The new ExtractionResult
+        """
+        with self._lock:
+            result = ExtractionResult(len(self._rows), document, library, status, **fields)
+            self._rows.append(result)
+            self.version += 1
+        return result
+
+    def get(self, row_id):
+        """Get a result by row ID, or None if it does not exist."""
+        if 0 <= row_id < len(self._rows):
+            return self._rows[row_id]
+        return None
+
+    def touch(self):
+        """Signal that existing rows were updated in place."""
+        with self._lock:
+            self.version += 1
+
+    def clear(self):
+        with self._lock:
+            self._rows = []
+            self.version += 1
+
+    def query(self, filter_text="", sort_field=None, descending=False):
+        """
+        Get the row IDs matching a filter, in display order.
+
+        Args:
+            filter_text: Case-insensitive substring matched against
+                document, library and status (empty matches everything)
+            sort_field: ExtractionResult attribute to sort by, None keeps
+                insertion order
+            descending: Reverse the sort order
+
+        Returns:
+            List of row IDs
+        """
+        with self._lock:
+            rows = list(self._rows)
+
+        needle = filter_text.strip().lower()
+        if needle:
+            rows = [
+                row for row in rows
+                if any(needle in str(getattr(row, field)).lower() for field in self.FILTER_FIELDS)
+            ]
+
+        if sort_field is not None:
+            # Missing values (None) always sort last
+            present = [row for row in rows if getattr(row, sort_field) is not None]
+            missing = [row for row in rows if getattr(row, sort_field) is None]
+            present.sort(key=lambda row: getattr(row, sort_field), reverse=descending)
+            rows = present + missing
+        elif descending:
+            rows.reverse()
+
+        return [row.row_id for row in rows]
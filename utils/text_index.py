@@ -0,0 +1,637 @@
+# utils/text_index.py
+import os
+import re
+import json
+import logging
+import sqlite3
+from contextlib import contextmanager
+from itertools import groupby
+
+import numpy as np
+
+from utils.agreement import TOKEN_PATTERN
+from utils.file_utils import EXTRACTION_LOG
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "text_index.sqlite"
+
+# Number of same-level segments that triggers a merge into the next level
+MERGE_FACTOR = 10
+
+# Extraction log lines indexed per write transaction by update()
+UPDATE_BATCH = 500
+
+QUERY_PATTERN = re.compile(r'(-?)"([^"]*)"|(\()|(\))|([^\s()"]+)')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    doc_id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    document TEXT NOT NULL,
+    file_type TEXT NOT NULL,
+    library TEXT NOT NULL,
+    deleted INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS docs_path ON docs (path, deleted);
+CREATE INDEX IF NOT EXISTS docs_filter ON docs (deleted, file_type, library);
+CREATE TABLE IF NOT EXISTS segments (
+    segment_id INTEGER PRIMARY KEY,
+    level INTEGER NOT NULL,
+    doc_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS postings (
+    term TEXT NOT NULL,
+    segment_id INTEGER NOT NULL,
+    doc_ids BLOB NOT NULL,
+    positions BLOB NOT NULL,
+    PRIMARY KEY (term, segment_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_segment ON postings (segment_id, term);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def encode_varints(values):
+    """Encode non-negative integers as LEB128 varints."""
+    values = np.asarray(values, dtype=np.int64)
+    if not len(values):
+        return b""
+
+    nbytes = np.ones(len(values), dtype=np.int64)
+    rest = values >> 7
+    while rest.any():
+        nbytes += rest > 0
+        rest >>= 7
+
+    offsets = np.concatenate(([0], np.cumsum(nbytes)[:-1]))
+    out = np.zeros(int(nbytes.sum()), dtype=np.uint8)
+    for k in range(int(nbytes.max())):
+        selected = nbytes > k
+        low_bits = (values[selected] >> (7 * k)) & 0x7f
+        more = (nbytes[selected] > k + 1).astype(np.int64) << 7
+        out[offsets[selected] + k] = low_bits | more
+    return out.tobytes()
+
+
+def decode_varints(blob):
+    """Decode a LEB128 varint byte string into an int64 array."""
+    data = np.frombuffer(blob, dtype=np.uint8)
+    if not len(data):
+        return np.empty(0, dtype=np.int64)
+
+    ends = np.flatnonzero(data < 0x80)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    shifts = 7 * (np.arange(len(data)) - np.repeat(starts, ends - starts + 1))
+    parts = (data & 0x7f).astype(np.int64) << shifts
+    return np.add.reduceat(parts, starts)
+
+
+def encode_postings(doc_ids, counts, positions):
+    """
+    Compress a posting list.
+
+    Args:
+        doc_ids: Sorted document IDs containing the term
+        counts: Number of occurrences of the term in each document
+        positions: Token positions, grouped by document and sorted within each
+
+    Returns:
+        Tuple of (doc_ids blob, positions blob)
+    """
+    doc_deltas = np.diff(doc_ids, prepend=0)
+    doc_blob = encode_varints(np.column_stack((doc_deltas, counts)).ravel())
+
+    # Positions are delta-encoded within each document
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    position_deltas = np.diff(positions, prepend=0)
+    position_deltas[starts] = positions[starts]
+    return doc_blob, encode_varints(position_deltas)
+
+
+def decode_doc_ids(doc_blob):
+    """Decode (doc_ids, counts) from a doc_ids blob."""
+    pairs = decode_varints(doc_blob).reshape(-1, 2)
+    return np.cumsum(pairs[:, 0]), pairs[:, 1]
+
+
+def decode_positions(position_blob, counts):
+    """Decode absolute token positions, grouped by document."""
+    deltas = decode_varints(position_blob)
+    running = np.cumsum(deltas)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    return running - np.repeat(running[starts] - deltas[starts], counts)
+
+
+class TextIndex:
+    """
+    On-disk inverted index over extracted texts.
+
+    Postings are written in immutable segments, one per flush. compact()
+    merges same-level segments once MERGE_FACTOR of them pile up, so the
+    number of segments a query reads stays logarithmic in the corpus
+    size; it is a separate step so that adding documents never waits on
+    a large merge. Re-saving a path replaces the previous document;
+    replaced documents are filtered out of query results and purged on
+    the next merge.
+    """
+
+    def __init__(self, output_dir="output"):
+        os.makedirs(output_dir, exist_ok=True)
+        self.path = os.path.join(output_dir, INDEX_FILE)
+        self.log_path = os.path.join(output_dir, EXTRACTION_LOG)
+        self.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self.conn.executescript(SCHEMA)
+        self._transaction_depth = 0
+
+        # term -> list of (doc_id, positions) waiting for the next flush
+        self._pending = {}
+        self._pending_docs = 0
+
+        # (file_type, library) -> sorted array of matching live doc IDs
+        self._filter_cache = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        self.flush()
+        self.conn.close()
+
+    def add_document(self, path, text, file_type, library, document):
+        """
+        Add an extracted text to the index, replacing any earlier version.
+
+        Args:
+            path: Path of the saved text file, identifies the extraction
+            text: The extracted text content
+            file_type: 'resume' or 'jd'
+            library: Name of the extraction library used
+            document: Original filename without extension
+
+        Returns:
+            The new document ID
+        """
+        with self._transaction():
+            self.conn.execute("UPDATE docs SET deleted = 1 WHERE path = ? AND deleted = 0", (path,))
+            doc_id = self.conn.execute(
+                "INSERT INTO docs (path, document, file_type, library) VALUES (?, ?, ?, ?)",
+                (path, document, file_type, library)
+            ).lastrowid
+
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        if tokens:
+            order = np.argsort(np.array(tokens), kind='stable')
+            sorted_tokens = [tokens[i] for i in order]
+            start = 0
+            for term, group in groupby(sorted_tokens):
+                end = start + sum(1 for _ in group)
+                self._pending.setdefault(term, []).append((doc_id, order[start:end]))
+                start = end
+
+        self._pending_docs += 1
+        self._filter_cache.clear()
+        return doc_id
+
+    def update(self, batch_size=UPDATE_BATCH):
+        """
+        Index extractions logged since the last update.
+
+        The log offset is stored in the index and advanced in the same
+        transaction that writes the documents, so concurrent updaters never
+        index a line twice and a failed update is retried by the next one.
+
+        Returns:
+            Number of documents added or replaced
+        """
+        self.flush()
+        indexed = 0
+        while os.path.exists(self.log_path):
+            with self._transaction():
+                offset = self._get_meta('log_offset')
+                if os.path.getsize(self.log_path) < offset:
+                    # The log was truncated or replaced: start over, re-adding a
+                    # path just replaces its earlier document
+                    offset = 0
+
+                lines = []
+                with open(self.log_path, 'rb') as f:
+                    f.seek(offset)
+                    for line in f:
+                        # Leave a partially written last line for the next update
+                        if not line.endswith(b'\n') or len(lines) == batch_size:
+                            break
+                        lines.append(line)
+                if not lines:
+                    break
+
+                # Only the latest entry per path matters, the file holds its text
+                latest = {}
+                for line in lines:
+                    try:
+                        entry = json.loads(line.decode('utf-8'))
+                        latest[entry['path']] = entry
+                    except (ValueError, KeyError, TypeError):
+                        logger.warning("Skipping malformed extraction log line: %r", line)
+
+                try:
+                    for entry in latest.values():
+                        text = self._read_text(entry['path'])
+                        if text is None:
+                            continue
+                        self.add_document(entry['path'], text, entry['file_type'],
+                                          entry['library'], entry['document'])
+                        indexed += 1
+                    self.flush()
+                except BaseException:
+                    # The rollback discards the docs rows these postings point at
+                    self._pending = {}
+                    self._pending_docs = 0
+                    raise
+                self._set_meta('log_offset', offset + sum(len(line) for line in lines))
+        return indexed
+
+    def flush(self):
+        """Write pending documents as a new segment."""
+        if not self._pending_docs:
+            return
+
+        with self._transaction():
+            segment_id = self.conn.execute(
+                "INSERT INTO segments (level, doc_count) VALUES (0, ?)", (self._pending_docs,)
+            ).lastrowid
+            rows = []
+            for term, entries in self._pending.items():
+                doc_ids = np.array([doc_id for doc_id, _ in entries], dtype=np.int64)
+                counts = np.array([len(positions) for _, positions in entries], dtype=np.int64)
+                positions = np.concatenate([positions for _, positions in entries]).astype(np.int64)
+                rows.append((term, segment_id) + encode_postings(doc_ids, counts, positions))
+            self.conn.executemany("INSERT INTO postings VALUES (?, ?, ?, ?)", rows)
+
+        self._pending = {}
+        self._pending_docs = 0
+
+    def compact(self):
+        """
+        Merge same-level segments until no level has MERGE_FACTOR of them.
+
+        Postings are read and merged outside any write transaction; the write
+        lock is only held to swap the merged segment in, so concurrent
+        writers are not kept waiting by a large merge.
+
+        Returns:
+            Number of merges done
+        """
+        self.flush()
+        merges = 0
+        while True:
+            row = self.conn.execute(
+                "SELECT level FROM segments GROUP BY level HAVING COUNT(*) >= ? ORDER BY level LIMIT 1",
+                (MERGE_FACTOR,)
+            ).fetchone()
+            if row is None:
+                return merges
+            if self._merge_level(row[0]):
+                merges += 1
+
+    def search(self, query, file_type=None, library=None, limit=50):
+        """
+        Run a boolean query against the index.
+
+        Terms are ANDed by default; OR, NOT (or a leading '-'), parentheses
+        and "quoted phrases" are supported.
+
+        Args:
+            query: Query string, e.g. 'python (django OR flask) -"php developer"'
+            file_type: Optional 'resume' or 'jd' filter
+            library: Optional extraction library filter
+            limit: Maximum number of hits to return (None for all)
+
+        Returns:
+            List of hit dictionaries, most recently indexed first
+        """
+        self.flush()
+        # Postings still hold replaced documents, and filters are not part of
+        # them: look only the matched IDs up in docs, newest first, until
+        # there are enough hits
+        matches = self._evaluate(self._parse(query), file_type, library)[::-1]
+
+        results = []
+        doc_ids = [int(doc_id) for doc_id in matches]
+        for start in range(0, len(doc_ids), 500):
+            chunk = doc_ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            hits = {}
+            # Filter in Python: with the filter columns in the WHERE clause
+            # SQLite may scan the docs_filter index instead of the doc_id lookups
+            for doc_id, path, document, doc_type, doc_library, deleted in self.conn.execute(
+                    f"SELECT doc_id, path, document, file_type, library, deleted FROM docs "
+                    f"WHERE doc_id IN ({placeholders})", chunk):
+                if deleted or file_type not in (None, doc_type) or library not in (None, doc_library):
+                    continue
+                hits[doc_id] = {
+                    'doc_id': doc_id,
+                    'path': path,
+                    'document': document,
+                    'file_type': doc_type,
+                    'library': doc_library
+                }
+            results.extend(hits[doc_id] for doc_id in chunk if doc_id in hits)
+            if limit is not None and len(results) >= limit:
+                return results[:limit]
+        return results
+
+    @contextmanager
+    def _transaction(self):
+        # Nested uses join the outermost transaction
+        if self._transaction_depth:
+            self._transaction_depth += 1
+            try:
+                yield
+            finally:
+                self._transaction_depth -= 1
+            return
+
+        # IMMEDIATE takes the write lock up front so concurrent writers queue
+        self.conn.execute("BEGIN IMMEDIATE")
+        self._transaction_depth = 1
+        try:
+            yield
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        finally:
+            self._transaction_depth = 0
+        self.conn.execute("COMMIT")
+
+    def _get_meta(self, key, default=0):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return default if row is None else row[0]
+
+    def _set_meta(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def _read_text(self, path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _merge_level(self, level):
+        """
+        Merge the segments of one level into a segment of the next.
+
+        Returns:
+            False if another process merged some of them first
+        """
+        segments = self.conn.execute(
+            "SELECT segment_id, doc_count FROM segments WHERE level = ?", (level,)
+        ).fetchall()
+        segment_ids = [segment_id for segment_id, _ in segments]
+        placeholders = ",".join("?" * len(segment_ids))
+        deleted = np.fromiter(
+            (doc_id for (doc_id,) in self.conn.execute("SELECT doc_id FROM docs WHERE deleted = 1")),
+            dtype=np.int64
+        )
+
+        rows = self.conn.execute(
+            f"SELECT term, doc_ids, positions FROM postings WHERE segment_id IN ({placeholders}) ORDER BY term",
+            segment_ids
+        ).fetchall()
+
+        merged = []
+        for term, parts in groupby(rows, key=lambda row: row[0]):
+            doc_ids, counts, positions = self._combine([(doc_blob, pos_blob) for _, doc_blob, pos_blob in parts])
+
+            # Drop replaced documents while rewriting
+            keep = ~np.isin(doc_ids, deleted)
+            if not keep.all():
+                positions = positions[np.repeat(keep, counts)]
+                doc_ids, counts = doc_ids[keep], counts[keep]
+            if len(doc_ids):
+                merged.append((term,) + encode_postings(doc_ids, counts, positions))
+
+        with self._transaction():
+            remaining = self.conn.execute(
+                f"SELECT COUNT(*) FROM segments WHERE segment_id IN ({placeholders})", segment_ids
+            ).fetchone()[0]
+            if remaining != len(segment_ids):
+                return False
+
+            new_segment = self.conn.execute(
+                "INSERT INTO segments (level, doc_count) VALUES (?, ?)",
+                (level + 1, sum(doc_count for _, doc_count in segments))
+            ).lastrowid
+            self.conn.executemany(
+                "INSERT INTO postings VALUES (?, ?, ?, ?)",
+                ((term, new_segment, doc_blob, position_blob) for term, doc_blob, position_blob in merged)
+            )
+            self.conn.execute(f"DELETE FROM postings WHERE segment_id IN ({placeholders})", segment_ids)
+            self.conn.execute(f"DELETE FROM segments WHERE segment_id IN ({placeholders})", segment_ids)
+        return True
+
+    def _combine(self, blobs):
+        """Decode several posting lists for one term into one, sorted by doc ID."""
+        doc_parts, count_parts, position_parts = [], [], []
+        for doc_blob, position_blob in blobs:
+            doc_ids, counts = decode_doc_ids(doc_blob)
+            doc_parts.append(doc_ids)
+            count_parts.append(counts)
+            position_parts.append(decode_positions(position_blob, counts))
+
+        doc_ids = np.concatenate(doc_parts)
+        counts = np.concatenate(count_parts)
+        positions = np.concatenate(position_parts)
+
+        order = np.argsort(doc_ids, kind='stable')
+        if np.any(order != np.arange(len(order))):
+            starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+            new_counts = counts[order]
+            new_starts = np.concatenate(([0], np.cumsum(new_counts)[:-1]))
+            gather = np.arange(len(positions)) + np.repeat(starts[order] - new_starts, new_counts)
+            doc_ids, counts, positions = doc_ids[order], new_counts, positions[gather]
+        return doc_ids, counts, positions
+
+    def _allowed_docs(self, file_type, library):
+        """All live doc IDs passing the filters; only a bare NOT needs them."""
+        key = (file_type, library)
+        if key not in self._filter_cache:
+            sql = "SELECT doc_id FROM docs WHERE deleted = 0"
+            params = []
+            if file_type is not None:
+                sql += " AND file_type = ?"
+                params.append(file_type)
+            if library is not None:
+                sql += " AND library = ?"
+                params.append(library)
+            doc_ids = np.fromiter((doc_id for (doc_id,) in self.conn.execute(sql, params)), dtype=np.int64)
+            self._filter_cache[key] = np.sort(doc_ids)
+        return self._filter_cache[key]
+
+    def _term_docs(self, term):
+        rows = self.conn.execute("SELECT doc_ids FROM postings WHERE term = ?", (term,)).fetchall()
+        if not rows:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate([decode_doc_ids(doc_blob)[0] for (doc_blob,) in rows]))
+
+    def _phrase_docs(self, terms, candidates=None):
+        for term in set(terms):
+            term_docs = self._term_docs(term)
+            if candidates is None:
+                candidates = term_docs
+            else:
+                candidates = np.intersect1d(candidates, term_docs, assume_unique=True)
+            if not len(candidates):
+                return candidates
+        if len(terms) == 1:
+            return candidates
+
+        # A phrase matches where term i sits at position p + i for every i;
+        # key each occurrence as (doc, p) and intersect across terms
+        keys = None
+        for offset, term in enumerate(terms):
+            rows = self.conn.execute(
+                "SELECT doc_ids, positions FROM postings WHERE term = ?", (term,)
+            ).fetchall()
+            doc_ids, counts, positions = self._combine(rows)
+            in_candidates = np.isin(doc_ids, candidates)
+            positions = positions[np.repeat(in_candidates, counts)]
+            owners = np.repeat(doc_ids[in_candidates], counts[in_candidates])
+            term_keys = np.unique((owners << 32) + positions - offset)
+            keys = term_keys if keys is None else np.intersect1d(keys, term_keys, assume_unique=True)
+        return np.unique(keys >> 32)
+
+    def _parse(self, query):
+        tokens = []
+        for negated, phrase, open_paren, close_paren, word in QUERY_PATTERN.findall(query):
+            if open_paren or close_paren:
+                tokens.append(open_paren or close_paren)
+                continue
+            if word in ('AND', 'OR', 'NOT'):
+                tokens.append(word)
+                continue
+
+            if word.startswith('-'):
+                negated, word = '-', word[1:]
+            terms = TOKEN_PATTERN.findall((phrase or word).lower())
+            if not terms:
+                # Nothing searchable (e.g. a stray '-' or '""'): drop it and
+                # any NOT in front of it rather than matching nothing
+                if tokens and tokens[-1] == 'NOT':
+                    tokens.pop()
+                continue
+            if negated:
+                tokens.append('NOT')
+            tokens.append(('phrase', terms))
+
+        if not tokens:
+            raise ValueError(f"Query has no searchable terms: {query!r}")
+        node, position = self._parse_or(tokens, 0)
+        if position != len(tokens):
+            raise ValueError(f"Unexpected token in query: {query!r}")
+        return node
+
+    def _parse_or(self, tokens, position):
+        node, position = self._parse_and(tokens, position)
+        while position < len(tokens) and tokens[position] == 'OR':
+            right, position = self._parse_and(tokens, position + 1)
+            node = ('or', node, right)
+        return node, position
+
+    def _parse_and(self, tokens, position):
+        node, position = self._parse_unary(tokens, position)
+        while position < len(tokens) and tokens[position] not in ('OR', ')'):
+            if tokens[position] == 'AND':
+                position += 1
+            right, position = self._parse_unary(tokens, position)
+            node = ('and', node, right)
+        return node, position
+
+    def _parse_unary(self, tokens, position):
+        if position >= len(tokens):
+            raise ValueError("Query ended unexpectedly")
+        token = tokens[position]
+        if token == 'NOT':
+            node, position = self._parse_unary(tokens, position + 1)
+            return ('not', node), position
+        if token == '(':
+            node, position = self._parse_or(tokens, position + 1)
+            if position >= len(tokens) or tokens[position] != ')':
+                raise ValueError("Unbalanced parentheses in query")
+            return node, position + 1
+        if isinstance(token, tuple):
+            return token, position + 1
+        raise ValueError(f"Unexpected token in query: {token!r}")
+
+    def _evaluate(self, node, file_type, library, candidates=None):
+        """
+        Get the sorted doc IDs matching a query node.
+
+        candidates, if given, limits the result to those doc IDs. Replaced
+        and filtered-out documents may still be included; search() drops them.
+        """
+        kind = node[0]
+        if kind == 'phrase':
+            if not node[1]:
+                return np.empty(0, dtype=np.int64)
+            return self._phrase_docs(node[1], candidates)
+        if kind == 'and':
+            left, right = node[1], node[2]
+            # Evaluate the positive side first so "NOT a b" needs no complement
+            if left[0] == 'not' and right[0] != 'not':
+                left, right = right, left
+            matches = self._evaluate(left, file_type, library, candidates)
+            if right[0] == 'not':
+                return np.setdiff1d(
+                    matches, self._evaluate(right[1], file_type, library, matches), assume_unique=True
+                )
+            return np.intersect1d(
+                matches, self._evaluate(right, file_type, library, matches), assume_unique=True
+            )
+        if kind == 'or':
+            return np.union1d(
+                self._evaluate(node[1], file_type, library, candidates),
+                self._evaluate(node[2], file_type, library, candidates)
+            )
+        if kind == 'not':
+            # A NOT with nothing positive to subtract from: the complement is
+            # taken over every live document passing the filters
+            if candidates is None:
+                candidates = self._allowed_docs(file_type, library)
+            return np.setdiff1d(
+                candidates, self._evaluate(node[1], file_type, library, candidates), assume_unique=True
+            )
+        raise ValueError(f"Unknown query node: {kind}")
+
+
+def update_text_index(output_dir="output"):
+    """
+    Index every logged extraction the index has not seen yet.
+
+    Cheap enough to run after each save; it also picks up saves whose
+    indexing failed earlier.
+
+    Returns:
+        Number of documents added or replaced
+    """
+    with TextIndex(output_dir) as index:
+        return index.update()
+
+
+def compact_text_index(output_dir="output"):
+    """
+    Catch up on unindexed extractions, then merge index segments.
+
+    Returns:
+        Number of merges done
+    """
+    with TextIndex(output_dir) as index:
+        index.update()
+        return index.compact()
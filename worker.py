@@ -0,0 +1,138 @@
+# worker.py
+import argparse
+import os
+
+from extractors import get_available_extractors
+from utils.agreement import summarize_agreement, cheapest_agreeing_library, mean_processing_times
+from utils.file_utils import (
+    create_output_directories,
+    is_valid_file_type,
+    get_file_type,
+    load_agreement_reports
+)
+from utils.job_queue import JobQueue, QUEUE_FILE, LEASE_SECONDS, run_worker
+from utils.text_index import TextIndex
+
+
+def enqueue_files(queue, paths, file_type, extractor_names=None, max_attempts=3):
+    """
+    Queue one job per (file, extractor) pair.
+
+    Returns:
+        Number of jobs added or requeued after failing (pairs already
+        pending, running or done are not counted)
+    """
+    count = 0
+    for path in paths:
+        if not is_valid_file_type(path):
+            print(f"Skipping {path}: must be PDF or DOCX format.")
+            continue
+
+        extractors = get_available_extractors(get_file_type(path))
+        # Page-cached variants and the fallback chain repeat other libraries'
+        # output, so they are opt-in
+        default_names = [name for name, spec in extractors.items() if not spec.derived]
+        for name in extractor_names or default_names:
+            if name not in extractors:
+                print(f"Skipping {name} for {path}: not available for this file type.")
+                continue
+            if queue.enqueue(os.path.abspath(path), file_type, name, max_attempts):
+                count += 1
+    return count
+
+
+def search_index(query, file_type=None, library=None, limit=50):
+    """Print the extractions matching a query, most recent first."""
+    with TextIndex() as index:
+        # Pick up anything saved but not indexed yet
+        index.update()
+        try:
+            hits = index.search(query, file_type, library, limit)
+        except ValueError as e:
+            raise SystemExit(f"Invalid query: {e}")
+
+    for hit in hits:
+        print(f"{hit['document']} ({hit['file_type']}, {hit['library']}): {hit['path']}")
+    print(f"{len(hits)} matches.")
+
+
+def print_agreement_summary(reference=None, threshold=0.95):
+    """Print per-pair agreement over every saved report, and the cheapest agreeing library."""
+    reports = load_agreement_reports()
+    if not reports:
+        print("No agreement reports found.")
+        return
+
+    summary = summarize_agreement(reports)
+    print(f"Agreement across {len(reports)} documents:")
+    for key, stats in sorted(summary.items()):
+        print(f"{key}: {stats['documents']} documents, "
+              f"cosine mean {stats['mean_cosine']:.3f} / median {stats['median_cosine']:.3f} / "
+              f"min {stats['min_cosine']:.3f}, jaccard mean {stats['mean_jaccard']:.3f} / "
+              f"min {stats['min_jaccard']:.3f}")
+
+    if reference:
+        mean_times = mean_processing_times(reports)
+        choice = cheapest_agreeing_library(summary, reference, mean_times, threshold)
+        seconds = mean_times.get(choice)
+        timing = "no timing recorded" if seconds is None else f"mean {seconds:.3f} s"
+        print(f"Cheapest library agreeing with {reference} (cosine >= {threshold}): {choice} ({timing})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Distribute extraction jobs across worker processes.")
+    parser.add_argument("--queue", default=os.path.join("output", QUEUE_FILE), help="Path to the shared queue file")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    enqueue_parser = subparsers.add_parser("enqueue", help="Queue files for extraction")
+    enqueue_parser.add_argument("--type", choices=["resume", "jd"], required=True, dest="file_type")
+    enqueue_parser.add_argument("--extractor", action="append", dest="extractors",
+                                help="Library to use (repeatable, default: all available)")
+    enqueue_parser.add_argument("--max-attempts", type=int, default=3)
+    enqueue_parser.add_argument("paths", nargs="+")
+
+    work_parser = subparsers.add_parser("work", help="Run jobs until the queue is drained")
+    work_parser.add_argument("--lease", type=float, default=LEASE_SECONDS, help="Lease length in seconds")
+    work_parser.add_argument("--forever", action="store_true", help="Keep polling when the queue is empty")
+
+    subparsers.add_parser("status", help="Show job counts by state")
+
+    search_parser = subparsers.add_parser("search", help="Search all extracted text")
+    search_parser.add_argument("query", help='e.g. \'python (django OR flask) -"php developer"\'')
+    search_parser.add_argument("--type", choices=["resume", "jd"], dest="file_type")
+    search_parser.add_argument("--library", help="Only text extracted by this library")
+    search_parser.add_argument("--limit", type=int, default=50, help="Maximum number of hits")
+
+    agreement_parser = subparsers.add_parser("agreement", help="Summarize library agreement across all documents")
+    agreement_parser.add_argument("--reference", help="Also pick the fastest library agreeing with this one")
+    agreement_parser.add_argument("--threshold", type=float, default=0.95,
+                                  help="Minimum mean cosine similarity to the reference")
+
+    args = parser.parse_args()
+    create_output_directories()
+    queue = JobQueue(args.queue)
+
+    if args.command == "enqueue":
+        count = enqueue_files(queue, args.paths, args.file_type, args.extractors, args.max_attempts)
+        print(f"Queued {count} jobs.")
+    elif args.command == "work":
+        summary = run_worker(queue, lease_seconds=args.lease, exit_when_idle=not args.forever)
+        print(f"Succeeded: {summary['succeeded']}, failed: {summary['failed']}")
+        if summary['cached_pages']:
+            ratio = summary['cache_hits'] / summary['cached_pages']
+            print(f"Page cache: {summary['cache_hits']}/{summary['cached_pages']} pages reused ({ratio:.0%})")
+        if summary['fallback_winners']:
+            winners = ", ".join(f"{name}: {count}" for name, count in sorted(summary['fallback_winners'].items()))
+            print(f"Fallback winners: {winners}")
+    elif args.command == "search":
+        search_index(args.query, args.file_type, args.library, args.limit)
+    elif args.command == "agreement":
+        print_agreement_summary(args.reference, args.threshold)
+    else:
+        for state, count in sorted(queue.counts().items()):
+            print(f"{state}: {count}")
+
+
+# Main entry point
+if __name__ == "__main__":
+    main()